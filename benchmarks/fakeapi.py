@@ -0,0 +1,325 @@
+"""Local stand-in for api.trakt.tv, api.themoviedb.org and image.tmdb.org.
+
+Serves recorded fixtures from benchmarks/fixtures with configurable latency
+and error injection, and counts every request it receives. Watch history
+added through /sync/history is kept per user and served back by the sync
+endpoints, all on the clock the server is given.
+"""
+
+import asyncio
+import datetime as dt
+import hashlib
+import json
+import random
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+
+FIXTURES = Path(__file__).parent / "fixtures"
+NEVER = dt.datetime(2010, 1, 1, tzinfo=dt.UTC)
+WATCHLIST_COUNTS = {"movies": 12, "shows": 5}
+
+# Smallest valid JPEG, enough for the image proxy to cache and serve.
+IMAGE_BYTES = bytes.fromhex(
+    "ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909"
+    "080a0c140d0c0b0b0c1912130f141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30"
+    "313434341f27393d38323c2e333432ffc0000b080001000101011100ffc4001f0000010501"
+    "010101010100000000000000000102030405060708090a0bffda0008010100003f00d2cf20ffd9"
+)
+
+
+def load_fixture(name: str) -> Any:
+    """Load a JSON fixture by file name."""
+    return json.loads((FIXTURES / name).read_text())
+
+
+def utcnow() -> dt.datetime:
+    """Return the current time, the default clock of the server."""
+    return dt.datetime.now(dt.UTC)
+
+
+def _timestamp(value: dt.datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+class FakeAPIServer:
+    """aiohttp server answering Trakt, TMDB and TMDB image requests.
+
+    Each Trakt user is identified by its bearer token, so many simulated
+    accounts can share one server while watching different things.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+        clock: Callable[[], dt.datetime] = utcnow,
+    ) -> None:
+        """Initialize the server."""
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.clock = clock
+        self.requests: Counter[str] = Counter()
+        # Watching fixture key per access token
+        self.watching: dict[str, str | None] = {}
+        # Watch history per access token, in the order it was added
+        self.history: defaultdict[str, list[dict[str, Any]]] = defaultdict(list)
+        self._random = random.Random(seed)
+        self._trakt: dict[str, Any] = load_fixture("trakt.json")
+        self._tmdb: dict[str, Any] = load_fixture("tmdb.json")
+        self._items: dict[str, dict[str, Any]] = load_fixture("watching.json")["items"]
+        # (type, trakt id) -> the item as it appears in history
+        self._media: dict[tuple[str, int], dict[str, Any]] = {}
+        for item in self._items.values():
+            media = {
+                key: item[key]
+                for key in ("type", "movie", "show", "episode")
+                if key in item
+            }
+            self._media[(item["type"], item[item["type"]]["ids"]["trakt"])] = media
+        # Item being watched per access token, and when it started
+        self._started_at: dict[str, tuple[str, dt.datetime]] = {}
+        self._history_ids = 0
+        self._runner: web.AppRunner | None = None
+        self.port = 0
+
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/trakt/users/me/watching", self._handle_watching)
+        app.router.add_get("/trakt/sync/last_activities", self._handle_activities)
+        app.router.add_get("/trakt/sync/history/{type}", self._handle_history)
+        app.router.add_post("/trakt/sync/history", self._handle_add_history)
+        app.router.add_get("/trakt/sync/watched/shows", self._handle_watched_shows)
+        app.router.add_get("/trakt/sync/watchlist/{type}", self._handle_watchlist)
+        app.router.add_get("/trakt/shows/{id}/seasons", self._handle_seasons)
+        app.router.add_get("/trakt/{path:.+}", self._handle_trakt)
+        app.router.add_get("/tmdb/3/{path:.+}", self._handle_tmdb)
+        app.router.add_get("/images/{size}/{file}", self._handle_image)
+        self._app = app
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server."""
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def total_requests(self) -> int:
+        """Return the number of requests served."""
+        return sum(self.requests.values())
+
+    async def async_start(self) -> None:
+        """Start listening on a random local port."""
+        self._runner = web.AppRunner(self._app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def async_stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @web.middleware
+    async def _middleware(
+        self,
+        request: web.Request,
+        handler: Any,
+    ) -> web.StreamResponse:
+        service = request.path.split("/")[1]
+        self.requests[service] += 1
+
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self._random.random() < self.error_rate:
+            return web.Response(
+                status=503,
+                text="<html>Service Unavailable</html>",
+                content_type="text/html",
+            )
+
+        response: web.StreamResponse = await handler(request)
+        if service == "trakt":
+            # Always far from the limit, and reset in real time like the
+            # rate limiter, whatever the server clock says
+            if request.method == "GET":
+                name, period, limit, remaining = "AUTHED_API_GET_LIMIT", 300, 1000, 999
+            else:
+                name, period, limit, remaining = "AUTHED_API_POST_LIMIT", 1, 1, 1
+            response.headers["x-ratelimit"] = json.dumps(
+                {
+                    "name": name,
+                    "period": period,
+                    "limit": limit,
+                    "remaining": remaining,
+                    "until": dt.datetime.now(dt.UTC).isoformat(),
+                }
+            )
+        return response
+
+    @staticmethod
+    def _token(request: web.Request) -> str:
+        return request.headers.get("Authorization", "").removeprefix("Bearer ")
+
+    def _json(self, request: web.Request, body: Any) -> web.Response:
+        text = json.dumps(body)
+        etag = f'"{hashlib.sha1(text.encode()).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            text=text, content_type="application/json", headers={"ETag": etag}
+        )
+
+    async def _handle_watching(self, request: web.Request) -> web.Response:
+        token = self._token(request)
+        key = self.watching.get(token)
+        if key is None:
+            return web.Response(status=204)
+
+        item = dict(self._items[key])
+        runtime = dt.timedelta(minutes=item.pop("runtime"))
+        progress = item.pop("progress", 0.3)
+        # Pin the start time while the user stays on an item, so repeated
+        # polls revalidate, and stop reporting it once it would have ended
+        now = self.clock()
+        pinned = self._started_at.get(token)
+        if pinned is None or pinned[0] != key:
+            pinned = (key, now.replace(microsecond=0) - runtime * progress)
+            self._started_at[token] = pinned
+        started_at = pinned[1]
+        if now >= started_at + runtime:
+            return web.Response(status=204)
+        item["started_at"] = _timestamp(started_at)
+        item["expires_at"] = _timestamp(started_at + runtime)
+        return self._json(request, item)
+
+    async def _handle_activities(self, request: web.Request) -> web.Response:
+        history = self.history[self._token(request)]
+        return self._json(
+            request,
+            {
+                f"{type}s": {
+                    "watched_at": max(
+                        (
+                            play["watched_at"]
+                            for play in history
+                            if play["type"] == type
+                        ),
+                        default=_timestamp(NEVER),
+                    )
+                }
+                for type in ("movie", "episode")
+            },
+        )
+
+    async def _handle_history(self, request: web.Request) -> web.Response:
+        type = request.match_info["type"].removesuffix("s")
+        query = request.query
+        start_at = dt.datetime.fromisoformat(query.get("start_at", _timestamp(NEVER)))
+        end_at = dt.datetime.fromisoformat(
+            query.get("end_at", _timestamp(self.clock()))
+        )
+        plays = sorted(
+            (
+                play
+                for play in self.history[self._token(request)]
+                if play["type"] == type
+                and start_at <= dt.datetime.fromisoformat(play["watched_at"]) <= end_at
+            ),
+            key=lambda play: (play["watched_at"], play["id"]),
+            reverse=True,
+        )
+        page, limit = int(query.get("page", 1)), int(query.get("limit", 10))
+        return self._json(request, plays[(page - 1) * limit : page * limit])
+
+    async def _handle_add_history(self, request: web.Request) -> web.Response:
+        history = self.history[self._token(request)]
+        body = await request.json()
+        added = {"movies": 0, "episodes": 0}
+        not_found: dict[str, list[Any]] = {"movies": [], "episodes": []}
+        for type in ("movie", "episode"):
+            for entry in body.get(f"{type}s", []):
+                media = self._media.get((type, entry["ids"].get("trakt")))
+                if media is None:
+                    not_found[f"{type}s"].append(entry)
+                    continue
+                watched_at = entry.get("watched_at") or _timestamp(self.clock())
+                self._history_ids += 1
+                history.append(
+                    {
+                        "id": self._history_ids,
+                        "watched_at": _timestamp(dt.datetime.fromisoformat(watched_at)),
+                        "action": "watch",
+                        **media,
+                    }
+                )
+                added[f"{type}s"] += 1
+        return web.json_response({"added": added, "not_found": not_found}, status=201)
+
+    async def _handle_watched_shows(self, request: web.Request) -> web.Response:
+        shows: dict[int, dict[str, Any]] = {}
+        for play in self.history[self._token(request)]:
+            if play["type"] != "episode":
+                continue
+            show = shows.setdefault(
+                play["show"]["ids"]["trakt"],
+                {"plays": 0, "show": play["show"], "seasons": {}},
+            )
+            show["plays"] += 1
+            show["last_watched_at"] = max(
+                show.get("last_watched_at", play["watched_at"]), play["watched_at"]
+            )
+            show["last_updated_at"] = show["last_watched_at"]
+            episodes = show["seasons"].setdefault(play["episode"]["season"], {})
+            episode = episodes.setdefault(
+                play["episode"]["number"],
+                {"number": play["episode"]["number"], "plays": 0},
+            )
+            episode["plays"] += 1
+            episode["last_watched_at"] = play["watched_at"]
+        for show in shows.values():
+            show["seasons"] = [
+                {"number": number, "episodes": list(episodes.values())}
+                for number, episodes in sorted(show["seasons"].items())
+            ]
+        return self._json(request, list(shows.values()))
+
+    async def _handle_watchlist(self, request: web.Request) -> web.Response:
+        response = self._json(request, [])
+        response.headers["X-Pagination-Item-Count"] = str(
+            WATCHLIST_COUNTS.get(request.match_info["type"], 0)
+        )
+        return response
+
+    async def _handle_seasons(self, request: web.Request) -> web.Response:
+        show_id = request.match_info["id"]
+        seasons = [
+            {"number": number, "episodes": self._trakt[key]}
+            for number in range(1, 100)
+            if (key := f"/shows/{show_id}/seasons/{number}?extended=full")
+            in self._trakt
+        ]
+        if not seasons:
+            return web.json_response({"error": "not found"}, status=404)
+        return self._json(request, seasons)
+
+    async def _handle_trakt(self, request: web.Request) -> web.Response:
+        key = request.path_qs.removeprefix("/trakt")
+        if key not in self._trakt:
+            return web.json_response({"error": "not found"}, status=404)
+        return self._json(request, self._trakt[key])
+
+    async def _handle_tmdb(self, request: web.Request) -> web.Response:
+        key = request.path.removeprefix("/tmdb/3")
+        if key not in self._tmdb:
+            return web.json_response({"status_code": 34}, status=404)
+        return self._json(request, self._tmdb[key])
+
+    async def _handle_image(self, request: web.Request) -> web.Response:
+        return web.Response(body=IMAGE_BYTES, content_type="image/jpeg")
@@ -0,0 +1,142 @@
+"""Home Assistant scaffolding to run Trakt coordinators against FakeAPIServer."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Coroutine
+from contextlib import asynccontextmanager
+from typing import Any
+
+from homeassistant import loader
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import frame
+from homeassistant.helpers.config_entry_oauth2_flow import (
+    LocalOAuth2Implementation,
+    OAuth2Session,
+)
+
+from custom_components.trakt.api import AsyncConfigEntryAuth
+from custom_components.trakt.const import DOMAIN, OAUTH2_AUTHORIZE, OAUTH2_TOKEN
+from custom_components.trakt.coordinator import (
+    TraktAccountUpdateCoordinator,
+    TraktData,
+    TraktHistoryUpdateCoordinator,
+    TraktUpNextUpdateCoordinator,
+    TraktWatchingUpdateCoordinator,
+)
+from custom_components.trakt.ratelimit import async_get_rate_limiter
+from custom_components.trakt.requester import async_get_requester, async_get_session
+from custom_components.trakt.writequeue import TraktWriteQueue
+
+from .fakeapi import FakeAPIServer
+
+CLIENT_ID = "0" * 64
+TMDB_API_KEY = "0" * 32
+
+
+class BenchmarkEntry:
+    """Stand-in for a ConfigEntry carrying only what the integration reads."""
+
+    def __init__(self, index: int, options: dict[str, Any] | None = None) -> None:
+        """Initialize the entry."""
+        self.entry_id = f"benchmark{index}"
+        self.domain = DOMAIN
+        self.title = f"Trakt {index}"
+        self.access_token = f"token{index}"
+        self.data: dict[str, Any] = {
+            "username": f"user{index}",
+            "tmdb_api_key": TMDB_API_KEY,
+            "token": {
+                "access_token": self.access_token,
+                "refresh_token": f"refresh{index}",
+                "token_type": "Bearer",
+                "expires_in": 7776000,
+                "expires_at": time.time() + 7776000,
+            },
+        }
+        self.options = options or {}
+
+    def async_create_background_task(
+        self,
+        hass: HomeAssistant,
+        target: Coroutine[Any, Any, Any],
+        name: str,
+        eager_start: bool = True,
+    ) -> asyncio.Task[Any]:
+        """Create a background task like ConfigEntry does."""
+        return hass.async_create_background_task(target, name, eager_start)
+
+
+@asynccontextmanager
+async def async_home_assistant(config_dir: str) -> AsyncIterator[HomeAssistant]:
+    """Run a bare Home Assistant instance with no integrations loaded."""
+    hass = HomeAssistant(config_dir)
+    loader.async_setup(hass)
+    if hasattr(frame, "async_setup"):
+        frame.async_setup(hass)
+    await hass.async_start()
+    try:
+        yield hass
+    finally:
+        await hass.async_stop(force=True)
+
+
+def async_create_coordinator(
+    hass: HomeAssistant,
+    server: FakeAPIServer,
+    entry: BenchmarkEntry,
+) -> TraktWatchingUpdateCoordinator:
+    """Wire a watching coordinator for an entry to the fake server."""
+    return async_create_data(hass, server, entry).watching
+
+
+def async_create_data(
+    hass: HomeAssistant,
+    server: FakeAPIServer,
+    entry: BenchmarkEntry,
+) -> TraktData:
+    """Wire every coordinator and the write queue of an entry to the fake server.
+
+    They all run on the server's clock, like async_setup_entry wires them.
+    """
+    implementation = LocalOAuth2Implementation(
+        hass, DOMAIN, CLIENT_ID, "secret", OAUTH2_AUTHORIZE, OAUTH2_TOKEN
+    )
+    session = OAuth2Session(hass, entry, implementation)  # type: ignore[arg-type]
+    entry_auth = AsyncConfigEntryAuth(
+        async_get_session(hass),
+        session,
+        async_get_rate_limiter(hass, CLIENT_ID),
+        async_get_requester(hass),
+        api_url=f"{server.url}/trakt",
+    )
+    watching = TraktWatchingUpdateCoordinator(
+        hass,
+        entry,  # type: ignore[arg-type]
+        entry_auth,
+        tmdb_api_url=f"{server.url}/tmdb/3",
+        tmdb_image_url=f"{server.url}/images",
+        clock=server.clock,
+    )
+    return TraktData(
+        watching=watching,
+        history=TraktHistoryUpdateCoordinator(
+            hass,
+            entry,  # type: ignore[arg-type]
+            entry_auth,
+            watching.id_index,
+        ),
+        up_next=TraktUpNextUpdateCoordinator(
+            hass,
+            entry,  # type: ignore[arg-type]
+            entry_auth,
+            watching.id_index,
+            clock=server.clock,
+        ),
+        account=TraktAccountUpdateCoordinator(
+            hass,
+            entry,  # type: ignore[arg-type]
+            entry_auth,
+            clock=server.clock,
+        ),
+        queue=TraktWriteQueue(hass, entry.entry_id, entry_auth, clock=server.clock),
+    )
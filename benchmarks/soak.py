@@ -0,0 +1,289 @@
+"""Soak many Trakt accounts against FakeAPIServer over a simulated day.
+
+Sets up N config entries that share one Home Assistant instance, session,
+rate limiter and requester, each with its watching, history, up next and
+account coordinators and write queue, and refreshes every one on the
+interval it asks for. The coordinators and the fake server share a
+simulated clock that jumps straight to the next due refresh, so a day runs
+in minutes while every refresh still makes real requests to the fake
+server and the poll scheduler sees playback start, end and overrun. Items
+an account moves on from are marked watched through its write queue, which
+feeds its history and up next.
+
+Reports event loop lag, peak RSS, requests per simulated minute, the
+watching poll intervals used and how refreshes cluster, and flags
+regressions against a saved baseline.
+
+    python -m benchmarks.soak --entries 200 --hours 24
+    python -m benchmarks.soak --json baseline.json
+    python -m benchmarks.soak --baseline baseline.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import heapq
+import json
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from custom_components.trakt.cache import async_get_shared_cache
+from custom_components.trakt.const import (
+    WRITE_FLUSH_DELAY,
+    WRITE_FLUSH_INTERVAL,
+    TraktQueuedWrite,
+)
+from custom_components.trakt.coordinator import TraktData
+
+from .fakeapi import FakeAPIServer, load_fixture
+from .harness import BenchmarkEntry, async_create_data, async_home_assistant
+from .update import percentile, report
+
+# How long each account stays on a scenario step, in simulated time
+STEP_DURATION = dt.timedelta(minutes=45)
+LAG_SAMPLE_INTERVAL = 0.05
+
+# Results where a higher value is a regression
+REGRESSION_KEYS = (
+    "loop_lag_ms_p95",
+    "loop_lag_ms_p99",
+    "rss_peak_mib",
+    "rss_growth_mib",
+    "requests_per_minute",
+    "requests_per_minute_peak",
+    "polls_per_second_peak",
+)
+
+
+class SimulatedClock:
+    """Clock that only moves when told to, shared by coordinators and server."""
+
+    def __init__(self) -> None:
+        """Start the clock at the current time."""
+        self.start = dt.datetime.now(dt.UTC).replace(microsecond=0)
+        self.seconds = 0.0
+
+    def __call__(self) -> dt.datetime:
+        """Return the simulated time."""
+        return self.start + dt.timedelta(seconds=self.seconds)
+
+
+def peak_rss_mib() -> float:
+    """Return the peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def async_sample_lag(lags: list[float], stop: asyncio.Event) -> None:
+    """Record how late the event loop wakes a sleeping task."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+        lags.append(time.perf_counter() - start - LAG_SAMPLE_INTERVAL)
+
+
+def watched_item(item: dict[str, Any], now: dt.datetime) -> TraktQueuedWrite:
+    """Return the history write marking a watching fixture item watched."""
+    return {
+        "kind": "history",
+        "media_type": item["type"],
+        "ids": {"trakt": item[item["type"]]["ids"]["trakt"]},
+        "queued_at": now.isoformat(),
+        "watched_at": now.isoformat(),
+    }
+
+
+async def async_refresh(data: TraktData, job: str) -> tuple[bool, float]:
+    """Run a job of an entry, returning whether it succeeded and when it is next due."""
+    if job in ("queue", "flush"):
+        await data.queue.async_flush()
+        return True, WRITE_FLUSH_INTERVAL.total_seconds()
+    coordinator = getattr(data, job)
+    await coordinator.async_refresh()
+    interval = coordinator.update_interval or dt.timedelta(minutes=1)
+    return coordinator.last_update_success, interval.total_seconds()
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the soak test and return its results."""
+    clock = SimulatedClock()
+    server = FakeAPIServer(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        clock=clock,
+    )
+    await server.async_start()
+    watching_fixture = load_fixture("watching.json")
+    scenario: list[str | None] = watching_fixture["scenario"]
+    rng = random.Random(args.seed)
+
+    lags: list[float] = []
+    polls_per_second: Counter[int] = Counter()
+    requests_per_minute: Counter[int] = Counter()
+    refreshes: Counter[str] = Counter()
+    failures: Counter[str] = Counter()
+    watching_intervals: Counter[float] = Counter()
+    day = dt.timedelta(hours=args.hours).total_seconds()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_home_assistant(config_dir) as hass:
+            entries = [BenchmarkEntry(index) for index in range(args.entries)]
+            datas = [async_create_data(hass, server, entry) for entry in entries]
+            for data in datas:
+                await data.watching.async_restore()
+                await data.history.async_restore()
+                await data.up_next.async_restore()
+                await data.account.async_restore()
+                await data.queue.async_load()
+            offsets = [rng.randrange(len(scenario)) for _ in entries]
+            watching: list[str | None] = [None] * len(entries)
+            rss_setup = peak_rss_mib()
+
+            stop = asyncio.Event()
+            sampler = asyncio.create_task(async_sample_lag(lags, stop))
+            started = time.perf_counter()
+
+            # (simulated seconds, entry index, job) of everything pending
+            due = [
+                (0.0, index, job)
+                for index in range(len(entries))
+                for job in ("watching", "history", "up_next", "account", "queue")
+            ]
+            heapq.heapify(due)
+            while due and due[0][0] < day:
+                now = due[0][0]
+                clock.seconds = now
+                batch: list[tuple[int, str]] = []
+                while due and due[0][0] == now:
+                    batch.append(heapq.heappop(due)[1:])
+
+                step = int(now // STEP_DURATION.total_seconds())
+                for index, job in batch:
+                    if job != "watching":
+                        continue
+                    key = scenario[(step + offsets[index]) % len(scenario)]
+                    if watching[index] not in (None, key):
+                        item = watching_fixture["items"][watching[index]]
+                        datas[index].queue.async_enqueue(watched_item(item, clock()))
+                        heapq.heappush(due, (now + WRITE_FLUSH_DELAY, index, "flush"))
+                    watching[index] = key
+                    server.watching[entries[index].access_token] = key
+
+                before = server.total_requests
+                results = await asyncio.gather(
+                    *(async_refresh(datas[index], job) for index, job in batch)
+                )
+                await hass.async_block_till_done(wait_background_tasks=True)
+
+                polls_per_second[int(now)] += len(batch)
+                requests_per_minute[int(now // 60)] += server.total_requests - before
+                for (index, job), (success, interval) in zip(
+                    batch, results, strict=True
+                ):
+                    refreshes[job] += 1
+                    if not success:
+                        failures[job] += 1
+                    if job == "watching":
+                        watching_intervals[interval] += 1
+                    # A flush after an enqueue comes on top of the periodic ones
+                    if job != "flush":
+                        heapq.heappush(due, (now + interval, index, job))
+
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await sampler
+            lags = lags or [0.0]
+            cache_entries = len(async_get_shared_cache(hass).metadata)
+            history_plays = sum(len(plays) for plays in server.history.values())
+            for data in datas:
+                await hass.async_add_executor_job(data.history.database.close)
+
+    await server.async_stop()
+
+    minutes = day / 60
+    rss_peak = peak_rss_mib()
+    polls = sum(refreshes.values())
+    return {
+        "entries": args.entries,
+        "simulated_hours": args.hours,
+        "wall_seconds": elapsed,
+        "polls": polls,
+        "polls_by_job": dict(refreshes),
+        "failed_polls": sum(failures.values()),
+        "failed_polls_by_job": dict(failures),
+        "watching_intervals_s": dict(sorted(watching_intervals.items())),
+        "history_plays": history_plays,
+        "requests_total": server.total_requests,
+        "requests_by_service": dict(server.requests),
+        "requests_per_minute": server.total_requests / minutes,
+        "requests_per_minute_peak": max(requests_per_minute.values(), default=0),
+        "polls_per_second_peak": max(polls_per_second.values(), default=0),
+        # Share of refreshes that landed on a second shared with another one
+        "polls_clustered": sum(n for n in polls_per_second.values() if n > 1)
+        / max(polls, 1),
+        "loop_lag_ms_p50": percentile(lags, 0.5) * 1000,
+        "loop_lag_ms_p95": percentile(lags, 0.95) * 1000,
+        "loop_lag_ms_p99": percentile(lags, 0.99) * 1000,
+        "loop_lag_ms_max": max(lags) * 1000,
+        "rss_peak_mib": rss_peak,
+        "rss_growth_mib": rss_peak - rss_setup,
+        "metadata_cache_entries": cache_entries,
+    }
+
+
+def regressions(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Return the results that got worse than the baseline by over tolerance."""
+    return [
+        key
+        for key in REGRESSION_KEYS
+        if isinstance(previous := baseline.get(key), int | float)
+        and previous > 0
+        and results[key] > previous * (1 + tolerance)
+    ]
+
+
+def main() -> None:
+    """Parse arguments and run the soak test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--latency", type=float, default=5, help="milliseconds")
+    parser.add_argument("--jitter", type=float, default=5, help="milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="write results to a file")
+    parser.add_argument("--baseline", type=Path, help="compare with saved results")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="relative increase over the baseline that counts as a regression",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(async_run(args))
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    report(results, baseline)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+    if baseline is not None and (
+        worse := regressions(results, baseline, args.tolerance)
+    ):
+        print(f"Regressed beyond {args.tolerance:.0%}: {', '.join(worse)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
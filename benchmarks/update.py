@@ -0,0 +1,139 @@
+"""Benchmark TraktWatchingUpdateCoordinator updates against FakeAPIServer.
+
+Replays the scenario in fixtures/watching.json and reports requests per
+update, wall time per update, metadata cache hit rate and allocations.
+
+    python -m benchmarks.update --updates 100 --latency 50 --error-rate 0.05
+    python -m benchmarks.update --json before.json
+    python -m benchmarks.update --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from .fakeapi import FakeAPIServer, load_fixture
+from .harness import BenchmarkEntry, async_create_coordinator, async_home_assistant
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the value at a fraction of the sorted values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the benchmark and return its results."""
+    server = FakeAPIServer(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    await server.async_start()
+    scenario: list[str | None] = load_fixture("watching.json")["scenario"]
+
+    wall_times: list[float] = []
+    requests: list[int] = []
+    allocations: list[int] = []
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_home_assistant(config_dir) as hass:
+            entry = BenchmarkEntry(0)
+            coordinator = async_create_coordinator(hass, server, entry)
+            await coordinator.async_restore()
+
+            if args.allocations:
+                tracemalloc.start()
+
+            for update in range(args.updates):
+                server.watching[entry.access_token] = scenario[update % len(scenario)]
+                before = server.total_requests
+                if args.allocations:
+                    tracemalloc.reset_peak()
+                    baseline = tracemalloc.get_traced_memory()[0]
+
+                start = time.perf_counter()
+                await coordinator.async_refresh()
+                wall_times.append(time.perf_counter() - start)
+
+                if args.allocations:
+                    allocations.append(tracemalloc.get_traced_memory()[1] - baseline)
+                # Count background prefetches against the update that started them
+                await hass.async_block_till_done(wait_background_tasks=True)
+                requests.append(server.total_requests - before)
+                if not coordinator.last_update_success:
+                    failures += 1
+
+            if args.allocations:
+                tracemalloc.stop()
+
+            cache = coordinator.metadata_cache
+            hit_rate = cache.hit_rate
+
+    await server.async_stop()
+
+    results: dict[str, Any] = {
+        "updates": args.updates,
+        "failed_updates": failures,
+        "requests_total": sum(requests),
+        "requests_by_service": dict(server.requests),
+        "requests_per_update": statistics.fmean(requests),
+        "wall_ms_mean": statistics.fmean(wall_times) * 1000,
+        "wall_ms_p50": percentile(wall_times, 0.5) * 1000,
+        "wall_ms_p95": percentile(wall_times, 0.95) * 1000,
+        "cache_hit_rate": hit_rate,
+    }
+    if allocations:
+        results["alloc_peak_kib_mean"] = statistics.fmean(allocations) / 1024
+        results["alloc_peak_kib_max"] = max(allocations) / 1024
+    return results
+
+
+def report(results: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    """Print results, with the change from a baseline if given."""
+    for key, value in results.items():
+        line = (
+            f"{key:24} {value:.3f}" if isinstance(value, float) else f"{key:24} {value}"
+        )
+        if baseline is not None and isinstance(value, int | float):
+            previous = baseline.get(key)
+            if isinstance(previous, int | float) and previous:
+                line += f"  ({(value - previous) / previous:+.1%})"
+        print(line)
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=20, help="milliseconds")
+    parser.add_argument("--jitter", type=float, default=10, help="milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-allocations",
+        dest="allocations",
+        action="store_false",
+        help="skip tracemalloc, which slows down updates",
+    )
+    parser.add_argument("--json", type=Path, help="write results to a file")
+    parser.add_argument("--compare", type=Path, help="compare with saved results")
+    args = parser.parse_args()
+
+    results = asyncio.run(async_run(args))
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    report(results, baseline)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
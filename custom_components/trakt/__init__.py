@@ -1,14 +1,58 @@
 """The Trakt integration."""
 
+import datetime as dt
+from functools import partial
+from pathlib import Path
+from typing import cast
+
+from aiohttp.web import Request
+from homeassistant.components import webhook
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import aiohttp_client, config_entry_oauth2_flow
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_entry_oauth2_flow
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.config_entry_oauth2_flow import LocalOAuth2Implementation
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.typing import ConfigType
 
 from . import api
-from .const import DOMAIN
+from .cache import TraktMetadataCache, async_get_shared_cache
+from .const import (
+    CONF_PUSH_UPDATES,
+    CONF_SCROBBLE_ENTITIES,
+    CONF_WEBHOOK_ID,
+    DOMAIN,
+    ID_INDEX_BACKFILL_CHECK_INTERVAL,
+    LOGGER,
+)
+from .coordinator import (
+    TraktAccountUpdateCoordinator,
+    TraktData,
+    TraktHistoryUpdateCoordinator,
+    TraktUpNextUpdateCoordinator,
+    TraktWatchingUpdateCoordinator,
+    account_store,
+    history_database_path,
+    state_store,
+)
+from .idmap import id_index_store
+from .ratelimit import TraktRateLimitedError, async_get_rate_limiter
+from .requester import RequestError, async_get_requester, async_get_session
+from .scrobbler import TraktAutoScrobbler
+from .services import async_setup_services
+from .writequeue import TraktWriteQueue, write_queue_store
+
+PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.MEDIA_PLAYER, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 
-PLATFORMS: list[Platform] = [Platform.MEDIA_PLAYER]
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Trakt services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -20,19 +64,140 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
 
     session = config_entry_oauth2_flow.OAuth2Session(hass, entry, implementation)
+    client_id = cast(LocalOAuth2Implementation, implementation).client_id
+
+    entry_auth = api.AsyncConfigEntryAuth(
+        async_get_session(hass),
+        session,
+        async_get_rate_limiter(hass, client_id),
+        async_get_requester(hass),
+    )
 
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = api.AsyncConfigEntryAuth(
-        aiohttp_client.async_get_clientsession(hass), session
+    watching = TraktWatchingUpdateCoordinator(hass, entry, entry_auth)
+    data = TraktData(
+        watching=watching,
+        history=TraktHistoryUpdateCoordinator(
+            hass, entry, entry_auth, watching.id_index
+        ),
+        up_next=TraktUpNextUpdateCoordinator(
+            hass, entry, entry_auth, watching.id_index
+        ),
+        account=TraktAccountUpdateCoordinator(hass, entry, entry_auth),
+        queue=TraktWriteQueue(hass, entry.entry_id, entry_auth),
     )
+    await data.watching.async_restore()
+    await data.history.async_restore()
+    await data.up_next.async_restore()
+    await data.account.async_restore()
+    await data.queue.async_load()
+
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = data
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(data.queue.async_start())
+
+    if entry.options.get(CONF_PUSH_UPDATES) and (
+        webhook_id := entry.options.get(CONF_WEBHOOK_ID)
+    ):
+
+        async def _async_handle_webhook(
+            hass: HomeAssistant, webhook_id: str, request: Request
+        ) -> None:
+            # Answer players right away; the debouncer merges event bursts
+            entry.async_create_background_task(
+                hass, data.watching.async_push_refresh(), name=f"{DOMAIN} push"
+            )
+
+        webhook.async_register(
+            hass, DOMAIN, entry.title, webhook_id, _async_handle_webhook
+        )
+        entry.async_on_unload(partial(webhook.async_unregister, hass, webhook_id))
+
+    @callback
+    def _async_backfill_if_due(now: dt.datetime | None = None) -> None:
+        if watching.id_index.needs_backfill:
+            entry.async_create_background_task(
+                hass, _async_backfill_ids(data), name=f"{DOMAIN} id backfill"
+            )
+
+    if scrobble_entities := entry.options.get(CONF_SCROBBLE_ENTITIES):
+        scrobbler = TraktAutoScrobbler(
+            hass, entry_auth, watching.id_index, data.queue, scrobble_entities
+        )
+        entry.async_on_unload(scrobbler.async_start())
+        # Reindex the bulk lists weekly, also while Home Assistant stays up
+        entry.async_on_unload(
+            async_track_time_interval(
+                hass, _async_backfill_if_due, ID_INDEX_BACKFILL_CHECK_INTERVAL
+            )
+        )
+
+    async def _async_first_refresh(hass: HomeAssistant) -> None:
+        entry.async_create_background_task(
+            hass, data.watching.async_refresh(), name=f"{DOMAIN} first refresh"
+        )
+        entry.async_create_background_task(
+            hass, data.history.async_refresh(), name=f"{DOMAIN} history sync"
+        )
+        entry.async_create_background_task(
+            hass, data.up_next.async_refresh(), name=f"{DOMAIN} up next"
+        )
+        entry.async_create_background_task(
+            hass, data.account.async_refresh(), name=f"{DOMAIN} account"
+        )
+        if scrobble_entities:
+            _async_backfill_if_due()
+
+    # Entities start from the restored state; fetch the current one once
+    # Home Assistant is up instead of holding up startup on the network.
+    entry.async_on_unload(async_at_started(hass, _async_first_refresh))
 
     return True
 
 
+async def _async_backfill_ids(data: TraktData) -> None:
+    try:
+        await data.watching.id_index.async_backfill(data.watching.entry_auth)
+    except (TraktRateLimitedError, RequestError) as err:
+        LOGGER.debug("Postponing id index backfill: %s", err)
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry when its options change."""
+    data: TraktData = hass.data[DOMAIN][entry.entry_id]
+    # Token refreshes update the entry data too, which needs no reload
+    if entry.options != data.watching.options:
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data: TraktData = hass.data[DOMAIN].pop(entry.entry_id)
+        await hass.async_add_executor_job(data.history.database.close)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data for a config entry."""
+    await TraktMetadataCache(hass, entry.entry_id).async_remove()
+    if not any(
+        other.entry_id != entry.entry_id
+        for other in hass.config_entries.async_entries(DOMAIN)
+    ):
+        await async_get_shared_cache(hass).async_remove()
+    await TraktMetadataCache(hass, entry.entry_id, name="seasons").async_remove()
+    await state_store(hass, entry.entry_id).async_remove()
+    await write_queue_store(hass, entry.entry_id).async_remove()
+    await account_store(hass, entry.entry_id).async_remove()
+    await id_index_store(hass, entry.entry_id).async_remove()
+    await hass.async_add_executor_job(
+        _remove_database, history_database_path(hass, entry.entry_id)
+    )
+
+
+def _remove_database(path: Path) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
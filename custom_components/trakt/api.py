@@ -1,12 +1,27 @@
 """API for Trakt bound to Home Assistant OAuth."""
 
-from typing import cast
+import asyncio
+import time
+from typing import Any, cast
 
-from aiohttp import ClientSession, client
+from aiohttp import ClientError, ClientSession, ClientTimeout, client, hdrs
+from homeassistant.core import callback
 from homeassistant.helpers import config_entry_oauth2_flow
 from homeassistant.helpers.config_entry_oauth2_flow import LocalOAuth2Implementation
 
-from .const import TraktUserProfile
+from .const import (
+    API_URL,
+    DOMAIN,
+    LOGGER,
+    TOKEN_EXPIRY_MARGIN,
+    TOKEN_REFRESH_AHEAD,
+    TOKEN_REFRESH_ATTEMPTS,
+    TOKEN_REFRESH_COOLDOWN,
+    TraktUserProfile,
+)
+from .ratelimit import RequestPriority, TraktRateLimiter
+from .requester import ConditionalCache, RequestError, ResilientRequester, backoff
+from .stats import RequestStats
 
 
 class AsyncConfigEntryAuth:
@@ -16,34 +31,182 @@ class AsyncConfigEntryAuth:
         self,
         websession: ClientSession,
         oauth_session: config_entry_oauth2_flow.OAuth2Session,
+        rate_limiter: TraktRateLimiter,
+        requester: ResilientRequester,
+        api_url: str = API_URL,
     ) -> None:
         """Initialize Trakt auth."""
         self._websession = websession
         self._oauth_session = oauth_session
+        self.rate_limiter = rate_limiter
+        self.requester = requester
+        self.api_url = api_url
+        self.stats = RequestStats()
+        self._conditional_cache = ConditionalCache()
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._refresh_failed_at: float | None = None
 
     async def async_get_access_token(self) -> str:
-        """Return a valid access token."""
-        if not self._oauth_session.valid_token:
-            await self._oauth_session.async_ensure_token_valid()
+        """Return a valid access token.
+
+        A token close to expiry is refreshed in the background while it is
+        still used, so only an already expired token waits for the refresh.
+        Concurrent callers share a single refresh.
+        """
+        expires_in = self._oauth_session.token["expires_at"] - time.time()
+        if expires_in <= TOKEN_EXPIRY_MARGIN:
+            await asyncio.shield(self._async_refresh_task())
+            if not self._oauth_session.valid_token:
+                raise RequestError("Trakt access token expired and refresh failed")
+        elif expires_in <= TOKEN_REFRESH_AHEAD and (
+            self._refresh_failed_at is None
+            or time.monotonic() - self._refresh_failed_at >= TOKEN_REFRESH_COOLDOWN
+        ):
+            self._async_refresh_task()
         return cast(str, self._oauth_session.token["access_token"])
 
-    async def async_user_profile(self) -> TraktUserProfile:
+    @callback
+    def _async_refresh_task(self) -> asyncio.Task[None]:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = (
+                self._oauth_session.config_entry.async_create_background_task(
+                    self._oauth_session.hass,
+                    self._async_refresh_token(),
+                    name=f"{DOMAIN} token refresh",
+                )
+            )
+        return self._refresh_task
+
+    async def _async_refresh_token(self) -> None:
+        """Refresh the token, retrying failures with backoff."""
+        hass = self._oauth_session.hass
+        entry = self._oauth_session.config_entry
+        error: Exception | None = None
+        for attempt in range(TOKEN_REFRESH_ATTEMPTS):
+            try:
+                token = await self._oauth_session.implementation.async_refresh_token(
+                    self._oauth_session.token
+                )
+            except (TimeoutError, ClientError) as err:
+                error = err
+            else:
+                hass.config_entries.async_update_entry(
+                    entry, data={**entry.data, "token": token}
+                )
+                self._refresh_failed_at = None
+                return
+
+            if attempt + 1 < TOKEN_REFRESH_ATTEMPTS:
+                await asyncio.sleep(backoff(attempt))
+
+        self._refresh_failed_at = time.monotonic()
+        LOGGER.warning("Failed to refresh Trakt access token: %s", error)
+
+    async def async_user_profile(
+        self, priority: RequestPriority = RequestPriority.HIGH
+    ) -> TraktUserProfile:
         """Return the user profile."""
-        response = await self.async_request(method="GET", path="/users/me")
-        return cast(TraktUserProfile, await response.json())
+        return cast(
+            TraktUserProfile,
+            await self.async_get_json("/users/me?extended=full", priority),
+        )
+
+    async def async_request(
+        self,
+        method: str,
+        path: str,
+        priority: RequestPriority = RequestPriority.HIGH,
+        json: Any = None,
+    ) -> client.ClientResponse:
+        url = f"{self.api_url}{path}"
+
+        async def send(timeout: ClientTimeout) -> client.ClientResponse:
+            return await self._async_send(method, url, {}, priority, timeout, json)
+
+        return await self.requester.async_request(url, send, stats=self.stats)
+
+    async def async_get_page(
+        self,
+        path: str,
+        page: int,
+        limit: int,
+    ) -> tuple[list[Any], int]:
+        """Return one page of a paginated list and the number of pages."""
+        separator = "&" if "?" in path else "?"
+        response = await self.async_request(
+            "GET", f"{path}{separator}page={page}&limit={limit}"
+        )
+        items = await response.json()
+        page_count = int(response.headers.get("X-Pagination-Page-Count", page))
+        return items, page_count
+
+    async def async_get_item_count(
+        self,
+        path: str,
+        priority: RequestPriority = RequestPriority.HIGH,
+    ) -> int:
+        """Return the length of a paginated list without fetching it."""
+        response = await self.async_request("GET", f"{path}?page=1&limit=1", priority)
+        response.release()
+        return int(response.headers.get("X-Pagination-Item-Count", 0))
+
+    async def async_get_json(
+        self,
+        path: str,
+        priority: RequestPriority = RequestPriority.HIGH,
+        shared: bool = False,
+        revalidate: bool = True,
+    ) -> Any:
+        """Return the parsed body of a GET, or None if it had none.
+
+        Responses are revalidated with ETag/Last-Modified, reusing the parsed
+        body on 304, unless revalidate is off for one-off paths that would only
+        churn the cache. Shared paths return the same for every user and are
+        coalesced with identical requests from other config entries.
+        """
+        url = f"{self.api_url}{path}"
 
-    async def async_request(self, method: str, path: str) -> client.ClientResponse:
+        async def send(
+            timeout: ClientTimeout, headers: dict[str, str]
+        ) -> client.ClientResponse:
+            return await self._async_send("GET", url, headers, priority, timeout)
+
+        return await self.requester.async_get_json(
+            url,
+            send,
+            self._conditional_cache if revalidate else None,
+            self.stats,
+            shared=shared,
+        )
+
+    async def _async_send(
+        self,
+        method: str,
+        url: str,
+        extra_headers: dict[str, str],
+        priority: RequestPriority,
+        timeout: ClientTimeout,
+        json: Any = None,
+    ) -> client.ClientResponse:
         implementation = cast(
             LocalOAuth2Implementation, self._oauth_session.implementation
         )
         client_id = implementation.client_id
         assert len(client_id) == 64, f"Trakt OAuth client_id not found: {client_id}"
 
-        url = f"https://api.trakt.tv{path}"
         headers = {
             "Content-Type": "application/json",
             "trakt-api-key": client_id,
             "trakt-api-version": "2",
+            **extra_headers,
         }
 
-        return await self._oauth_session.async_request(method, url, headers=headers)
+        access_token = await self.async_get_access_token()
+        headers[hdrs.AUTHORIZATION] = f"Bearer {access_token}"
+
+        await self.rate_limiter.async_acquire(priority, method)
+        response = await self._websession.request(
+            method, url, headers=headers, json=json, timeout=timeout
+        )
+        self.rate_limiter.async_update(method, response.status, response.headers)
+        return response
@@ -0,0 +1,81 @@
+"""Selection of TMDB artwork from a title fetched with its images appended."""
+
+from typing import Any, Literal
+
+ImageKind = Literal["backdrop", "poster", "still"]
+
+ASPECT_RATIOS: dict[ImageKind, float] = {
+    "backdrop": 16 / 9,
+    "poster": 2 / 3,
+    "still": 16 / 9,
+}
+ASPECT_RATIO_TOLERANCE = 0.05
+
+
+def _rank(image: dict[str, Any], kind: ImageKind, language: str) -> tuple[Any, ...]:
+    """Return a sort key putting the best image for a kind first.
+
+    Backdrops and stills are shown behind other content, so images without
+    text come first; posters carry their title, so the user's language wins.
+    Images of the wrong shape come next, then the best voted.
+    """
+    image_language = image.get("iso_639_1")
+    if kind == "poster":
+        language_rank = (image_language != language, image_language is not None)
+    else:
+        language_rank = (image_language is not None, image_language != language)
+    aspect_ratio = image.get("aspect_ratio") or ASPECT_RATIOS[kind]
+    misshapen = abs(aspect_ratio - ASPECT_RATIOS[kind]) > ASPECT_RATIO_TOLERANCE
+    return (
+        *language_rank,
+        misshapen,
+        -(image.get("vote_average") or 0),
+        -(image.get("vote_count") or 0),
+        -(image.get("width") or 0),
+    )
+
+
+def best_image(
+    images: list[dict[str, Any]], kind: ImageKind, language: str
+) -> str | None:
+    """Return the file path of the best ranked image, if any."""
+    if not images:
+        return None
+    best = min(images, key=lambda image: _rank(image, kind, language))
+    file_path: str = best["file_path"]
+    return file_path
+
+
+def select_artwork(
+    data: dict[str, Any], language: str, season: int | None = None
+) -> dict[str, Any]:
+    """Reduce a title with appended images, and season, to the artwork used.
+
+    Episode stills are keyed by episode number as a string, so the result
+    can be persisted as JSON unchanged.
+    """
+    images = data.get("images", {})
+    stills = {}
+    if season is not None:
+        for episode in data.get(f"season/{season}", {}).get("episodes", []):
+            if still_path := episode.get("still_path"):
+                stills[str(episode["episode_number"])] = still_path
+    return {
+        "backdrop": best_image(images.get("backdrops", []), "backdrop", language),
+        "poster": best_image(images.get("posters", []), "poster", language),
+        "stills": stills,
+    }
+
+
+def image_size(sizes: list[str] | None, requested: str) -> str:
+    """Return the smallest available size at least as wide as the requested one.
+
+    TMDB only serves the sizes /configuration lists for each kind of image.
+    """
+    if not sizes or requested in sizes or not requested.startswith("w"):
+        return requested
+    width = int(requested[1:])
+    widths = sorted(
+        int(size[1:]) for size in sizes if size.startswith("w") and size[1:].isdigit()
+    )
+    return next((f"w{w}" for w in widths if w >= width), "original")
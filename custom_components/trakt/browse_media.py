@@ -0,0 +1,160 @@
+"""Media browser over the Trakt watchlist, history, collection and calendar."""
+
+import datetime as dt
+import time
+from collections import OrderedDict
+from typing import Any
+
+from homeassistant.components.media_player.browse_media import BrowseMedia
+from homeassistant.components.media_player.const import MediaClass, MediaType
+from homeassistant.components.media_player.errors import BrowseError
+
+from .api import AsyncConfigEntryAuth
+from .const import (
+    BROWSE_CACHE_MAX_SIZE,
+    BROWSE_CACHE_TTL,
+    BROWSE_CALENDAR_DAYS,
+    BROWSE_PAGE_SIZE,
+)
+from .models import episode_title
+from .ratelimit import TraktRateLimitedError
+from .requester import RequestError
+
+# node: (title, path, whether Trakt paginates the path)
+NODES: dict[str, tuple[str, str, bool]] = {
+    "watchlist": ("Watchlist", "/sync/watchlist", True),
+    "history": ("Recently watched", "/sync/history", True),
+    "collection_movies": ("Movie collection", "/sync/collection/movies", False),
+    "collection_shows": ("Show collection", "/sync/collection/shows", False),
+    "calendar": ("Upcoming episodes", "/calendars/my/shows", False),
+}
+
+
+def _folder(node: str, page: int, title: str) -> BrowseMedia:
+    return BrowseMedia(
+        media_class=MediaClass.DIRECTORY,
+        media_content_id=f"{node}/{page}",
+        media_content_type=node,
+        title=title,
+        can_play=False,
+        can_expand=True,
+        children_media_class=MediaClass.DIRECTORY,
+    )
+
+
+def _item(item: dict[str, Any]) -> BrowseMedia | None:
+    if "episode" in item and "show" in item:
+        episode, show = item["episode"], item["show"]
+        title = episode_title(
+            show["title"],
+            episode["season"],
+            episode["number"],
+            episode.get("title") or "TBA",
+        )
+        if first_aired := item.get("first_aired"):
+            title = f"{dt.datetime.fromisoformat(first_aired).date()} {title}"
+        media_class, media_type = MediaClass.EPISODE, MediaType.EPISODE
+        trakt_id = episode["ids"]["trakt"]
+    elif "movie" in item:
+        movie = item["movie"]
+        title = (
+            f"{movie['title']} ({movie['year']})"
+            if movie.get("year")
+            else movie["title"]
+        )
+        media_class, media_type = MediaClass.MOVIE, MediaType.MOVIE
+        trakt_id = movie["ids"]["trakt"]
+    elif "show" in item and "season" not in item:
+        show = item["show"]
+        title = show["title"]
+        media_class, media_type = MediaClass.TV_SHOW, MediaType.TVSHOW
+        trakt_id = show["ids"]["trakt"]
+    else:
+        return None
+
+    return BrowseMedia(
+        media_class=media_class,
+        media_content_id=f"{media_type}/{trakt_id}",
+        media_content_type=media_type,
+        title=title,
+        can_play=False,
+        can_expand=False,
+    )
+
+
+class TraktMediaBrowser:
+    """Browse Trakt lists one page at a time.
+
+    Each folder requests a single page using Trakt's pagination headers and
+    links to the next page, so opening a long watchlist never loads it all.
+    Collections are not paginated by Trakt and are paged locally instead.
+    Pages are kept for a short time so navigating back and forth is served
+    from memory.
+    """
+
+    def __init__(self, entry_auth: AsyncConfigEntryAuth) -> None:
+        """Initialize the media browser."""
+        self._entry_auth = entry_auth
+        self._pages: OrderedDict[tuple[str, int], tuple[float, list[Any], int]] = (
+            OrderedDict()
+        )
+
+    async def async_browse(self, media_content_id: str | None) -> BrowseMedia:
+        """Return the root or one page of a folder."""
+        node, _, page_id = (media_content_id or "root/1").partition("/")
+        # The root folder is browsed again by its own id when navigating back
+        if node == "root":
+            root = _folder("root", 1, "Trakt")
+            root.children = [
+                _folder(node, 1, title) for node, (title, _, _) in NODES.items()
+            ]
+            return root
+
+        if node not in NODES or not page_id.isdigit():
+            raise BrowseError(f"Unknown media content id {media_content_id}")
+        page = int(page_id)
+
+        try:
+            items, page_count = await self._async_get_page(node, page)
+        except (TraktRateLimitedError, RequestError) as err:
+            raise BrowseError(f"Failed to load {NODES[node][0]}: {err}") from err
+
+        title = NODES[node][0]
+        folder = _folder(node, page, title if page == 1 else f"{title} ({page})")
+        folder.children = [child for item in items if (child := _item(item))]
+        if page < page_count:
+            folder.children.append(_folder(node, page + 1, "Next page"))
+        return folder
+
+    async def _async_get_page(self, node: str, page: int) -> tuple[list[Any], int]:
+        key = (node, page)
+        if (cached := self._pages.get(key)) is not None and cached[
+            0
+        ] > time.monotonic():
+            self._pages.move_to_end(key)
+            return cached[1], cached[2]
+
+        _, path, paginated = NODES[node]
+        if paginated:
+            items, page_count = await self._entry_auth.async_get_page(
+                path, page, BROWSE_PAGE_SIZE
+            )
+        else:
+            if node == "calendar":
+                path = f"{path}/{dt.date.today().isoformat()}/{BROWSE_CALENDAR_DAYS}"
+            # Collections are revalidated, so repeat visits usually cost a 304
+            everything = (
+                await self._entry_auth.async_get_json(
+                    path, revalidate=node != "calendar"
+                )
+                or []
+            )
+            start = (page - 1) * BROWSE_PAGE_SIZE
+            items = everything[start : start + BROWSE_PAGE_SIZE]
+            page_count = max(1, -(-len(everything) // BROWSE_PAGE_SIZE))
+
+        self._pages[key] = (time.monotonic() + BROWSE_CACHE_TTL, items, page_count)
+        self._pages.move_to_end(key)
+        while len(self._pages) > BROWSE_CACHE_MAX_SIZE:
+            self._pages.popitem(last=False)
+        return items, page_count
@@ -0,0 +1,167 @@
+"""Persistent metadata cache for the Trakt integration."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, TypedDict
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CACHE_MAX_SIZE,
+    CACHE_SAVE_DELAY,
+    CACHE_STORAGE_VERSION,
+    CACHE_TTL,
+    DATA_SHARED_CACHE,
+    DOMAIN,
+    PREFETCH_MAX_TRACKED,
+)
+from .requester import ConditionalCache
+
+
+class _CacheEntry(TypedDict):
+    expires_at: float
+    data: dict[str, Any]
+
+
+class TraktMetadataCache:
+    """Bounded LRU cache of Trakt extended info keyed by (type, trakt id).
+
+    Entries expire after a TTL and are persisted with Home Assistant's storage
+    helper so a restart doesn't refetch metadata that is still fresh. Each
+    name is a separate store, so bulky payloads can be kept apart.
+    """
+
+    hits: int
+    misses: int
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        max_size: int = CACHE_MAX_SIZE,
+        ttl: float = CACHE_TTL.total_seconds(),
+        name: str = "metadata",
+    ) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, _CacheEntry]] = Store(
+            hass, CACHE_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.{name}"
+        )
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(type: str, id: int | str) -> str:
+        return f"{type}:{id}"
+
+    async def async_load(self) -> None:
+        """Load persisted entries, dropping any that have expired."""
+        stored = await self._store.async_load() or {}
+        now = time.time()
+        for key, entry in stored.items():
+            if entry["expires_at"] > now:
+                self._entries[key] = entry
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    async def async_remove(self) -> None:
+        """Remove the persisted cache."""
+        self._entries.clear()
+        await self._store.async_remove()
+
+    def get(self, type: str, id: int | str) -> dict[str, Any] | None:
+        """Return a cached object, or None if missing or expired."""
+        key = self._key(type, id)
+        entry = self._entries.get(key)
+        if entry is None or entry["expires_at"] <= time.time():
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry["data"]
+
+    def get_stale(self, type: str, id: int | str) -> dict[str, Any] | None:
+        """Return a cached object even if expired, without counting a lookup."""
+        entry = self._entries.get(self._key(type, id))
+        return entry["data"] if entry is not None else None
+
+    @callback
+    def set(self, type: str, id: int | str, data: dict[str, Any]) -> None:
+        """Store an object and schedule a save."""
+        key = self._key(type, id)
+        self._entries[key] = {"expires_at": time.time() + self._ttl, "data": data}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+        self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    @property
+    def hit_rate(self) -> float | None:
+        """Return the fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        if total == 0:
+            return None
+        return self.hits / total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @callback
+    def _data_to_save(self) -> dict[str, _CacheEntry]:
+        return dict(self._entries)
+
+
+class TraktSharedCache:
+    """Title metadata and TMDB responses shared by every config entry.
+
+    None of it depends on the account, so accounts watching the same title
+    make one set of requests between them instead of one each.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self.metadata = TraktMetadataCache(hass, "shared")
+        self.tmdb_conditional_cache = ConditionalCache()
+        self.tmdb_configuration: dict[str, Any] | None = None
+        # Episodes whose successor was prefetched, oldest first
+        self._prefetched: OrderedDict[str, None] = OrderedDict()
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the persisted metadata, once for all entries."""
+        async with self._load_lock:
+            if not self._loaded:
+                await self.metadata.async_load()
+                self._loaded = True
+
+    def claim_prefetch(self, content_id: str) -> bool:
+        """Return whether the episode after this one is not prefetched yet.
+
+        The first account to ask claims it, so the others skip the requests.
+        """
+        if content_id in self._prefetched:
+            return False
+        self._prefetched[content_id] = None
+        while len(self._prefetched) > PREFETCH_MAX_TRACKED:
+            self._prefetched.popitem(last=False)
+        return True
+
+    async def async_remove(self) -> None:
+        """Remove the persisted metadata."""
+        self.tmdb_configuration = None
+        await self.metadata.async_remove()
+
+
+@callback
+def async_get_shared_cache(hass: HomeAssistant) -> TraktSharedCache:
+    """Return the cache shared by all config entries."""
+    if DATA_SHARED_CACHE not in hass.data:
+        hass.data[DATA_SHARED_CACHE] = TraktSharedCache(hass)
+    shared_cache: TraktSharedCache = hass.data[DATA_SHARED_CACHE]
+    return shared_cache
@@ -0,0 +1,250 @@
+"""Trakt calendars of upcoming episodes and movies."""
+
+import asyncio
+import datetime as dt
+import time
+from collections import OrderedDict
+from typing import Any, Literal
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.start import async_at_started
+from homeassistant.util import dt as dt_util
+
+from .api import AsyncConfigEntryAuth
+from .const import (
+    CALENDAR_EPISODE_RUNTIME,
+    CALENDAR_MAX_WINDOWS,
+    CALENDAR_PAST_WINDOW_TTL,
+    CALENDAR_WINDOW_DAYS,
+    CALENDAR_WINDOW_TTL,
+    DOMAIN,
+    LOGGER,
+)
+from .coordinator import TraktData
+from .models import episode_title
+from .ratelimit import TraktRateLimitedError
+from .requester import RequestError
+
+SCAN_INTERVAL = dt.timedelta(minutes=15)
+
+# Windows are aligned to a fixed Monday so every query maps onto the same ones
+WINDOW_EPOCH = dt.date(2000, 1, 3)
+
+
+def _window_index(date: dt.date) -> int:
+    return (date - WINDOW_EPOCH).days // CALENDAR_WINDOW_DAYS
+
+
+def _window_start(index: int) -> dt.date:
+    return WINDOW_EPOCH + dt.timedelta(days=index * CALENDAR_WINDOW_DAYS)
+
+
+def _episode_event(item: dict[str, Any]) -> CalendarEvent:
+    episode, show = item["episode"], item["show"]
+    start = dt.datetime.fromisoformat(item["first_aired"])
+    runtime = episode.get("runtime") or show.get("runtime") or CALENDAR_EPISODE_RUNTIME
+    return CalendarEvent(
+        start=start,
+        end=start + dt.timedelta(minutes=runtime),
+        summary=episode_title(
+            show["title"],
+            episode["season"],
+            episode["number"],
+            episode.get("title") or "TBA",
+        ),
+        description=episode.get("overview"),
+        uid=f"episode/{episode['ids']['trakt']}",
+    )
+
+
+def _movie_event(item: dict[str, Any]) -> CalendarEvent:
+    movie = item["movie"]
+    released = dt.date.fromisoformat(item["released"])
+    return CalendarEvent(
+        start=released,
+        end=released + dt.timedelta(days=1),
+        summary=movie["title"],
+        description=movie.get("overview"),
+        uid=f"movie/{movie['ids']['trakt']}",
+    )
+
+
+class TraktCalendarCache:
+    """Calendar events fetched in fixed, aligned date windows.
+
+    Range queries are answered from whichever windows overlap them, so
+    scrolling the frontend only costs a request for windows that were not
+    fetched within their TTL. Past windows rarely change and are kept longer.
+    A window that fails to refresh is served stale.
+    """
+
+    def __init__(
+        self,
+        entry_auth: AsyncConfigEntryAuth,
+        kind: Literal["shows", "movies"],
+    ) -> None:
+        """Initialize the cache."""
+        self._entry_auth = entry_auth
+        self._kind = kind
+        self._windows: OrderedDict[int, tuple[float, list[CalendarEvent]]] = (
+            OrderedDict()
+        )
+        self._inflight: dict[int, asyncio.Task[list[CalendarEvent]]] = {}
+
+    async def async_get_events(
+        self, start: dt.datetime, end: dt.datetime
+    ) -> list[CalendarEvent]:
+        """Return the events overlapping a time range, sorted by start."""
+        first = _window_index(dt_util.as_utc(start).date() - dt.timedelta(days=1))
+        last = _window_index(dt_util.as_utc(end).date())
+        windows = await asyncio.gather(
+            *(self._async_get_window(index) for index in range(first, last + 1))
+        )
+        return sorted(
+            (
+                event
+                for events in windows
+                for event in events
+                if event.start_datetime_local < end and event.end_datetime_local > start
+            ),
+            key=lambda event: event.start_datetime_local,
+        )
+
+    def _ttl(self, index: int) -> float:
+        if _window_start(index + 1) < dt_util.utcnow().date():
+            return CALENDAR_PAST_WINDOW_TTL
+        return CALENDAR_WINDOW_TTL
+
+    async def _async_get_window(self, index: int) -> list[CalendarEvent]:
+        cached = self._windows.get(index)
+        if cached is not None and time.monotonic() - cached[0] < self._ttl(index):
+            self._windows.move_to_end(index)
+            return cached[1]
+
+        if (task := self._inflight.get(index)) is None:
+            task = asyncio.get_running_loop().create_task(self._async_fetch(index))
+            self._inflight[index] = task
+            task.add_done_callback(lambda task: self._async_finish(index, task))
+        try:
+            return await asyncio.shield(task)
+        except (TraktRateLimitedError, RequestError):
+            if cached is None:
+                raise
+            return cached[1]
+
+    @callback
+    def _async_finish(
+        self, index: int, task: asyncio.Task[list[CalendarEvent]]
+    ) -> None:
+        if self._inflight.get(index) is task:
+            del self._inflight[index]
+        # Every waiter may have been cancelled, so retrieve the exception here
+        if not task.cancelled():
+            task.exception()
+
+    async def _async_fetch(self, index: int) -> list[CalendarEvent]:
+        start = _window_start(index).isoformat()
+        items = (
+            await self._entry_auth.async_get_json(
+                f"/calendars/my/{self._kind}/{start}/{CALENDAR_WINDOW_DAYS}"
+                "?extended=full"
+            )
+            or []
+        )
+        to_event = _episode_event if self._kind == "shows" else _movie_event
+        events = [to_event(item) for item in items]
+
+        self._windows[index] = (time.monotonic(), events)
+        self._windows.move_to_end(index)
+        while len(self._windows) > CALENDAR_MAX_WINDOWS:
+            self._windows.popitem(last=False)
+        return events
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Trakt calendars from a config entry."""
+    data: TraktData = hass.data[DOMAIN][entry.entry_id]
+    username = entry.data["username"]
+
+    async_add_entities(
+        [
+            TraktCalendar(data, username, "shows", "Upcoming episodes"),
+            TraktCalendar(data, username, "movies", "Upcoming movies"),
+        ]
+    )
+
+
+class TraktCalendar(CalendarEntity):
+    """Upcoming episodes or movies from the Trakt calendar."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        data: TraktData,
+        username: str,
+        kind: Literal["shows", "movies"],
+        name: str,
+    ) -> None:
+        """Initialize the calendar."""
+        self._cache = TraktCalendarCache(data.watching.entry_auth, kind)
+        self._event: CalendarEvent | None = None
+        self._attr_name = name
+        self._attr_unique_id = f"{username}_calendar_{kind}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, username)},
+            manufacturer="Trakt",
+            model="Trakt API",
+            name="Trakt",
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Look up the next event once Home Assistant has started."""
+        await super().async_added_to_hass()
+        self.async_on_remove(async_at_started(self.hass, self._async_first_update))
+
+    @callback
+    def _async_first_update(self, hass: HomeAssistant) -> None:
+        # A background task, so startup does not wait for the calendar requests
+        hass.async_create_background_task(
+            self.async_update_ha_state(force_refresh=True),
+            name=f"{DOMAIN} calendar {self.entity_id}",
+        )
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the current or next upcoming event."""
+        return self._event
+
+    async def async_update(self) -> None:
+        """Find the next event, usually from windows already cached."""
+        now = dt_util.now()
+        try:
+            events = await self._cache.async_get_events(
+                now, now + dt.timedelta(days=CALENDAR_WINDOW_DAYS)
+            )
+        except (TraktRateLimitedError, RequestError) as err:
+            LOGGER.debug("Failed to update Trakt calendar: %s", err)
+            return
+        self._event = events[0] if events else None
+
+    async def async_get_events(
+        self,
+        hass: HomeAssistant,
+        start_date: dt.datetime,
+        end_date: dt.datetime,
+    ) -> list[CalendarEvent]:
+        """Return the events in a time range."""
+        try:
+            return await self._cache.async_get_events(start_date, end_date)
+        except (TraktRateLimitedError, RequestError) as err:
+            raise HomeAssistantError(f"Failed to load Trakt calendar: {err}") from err
@@ -4,13 +4,27 @@ import logging
 from typing import Any, cast
 
 import voluptuous as vol
-from aiohttp import ClientSession
-from homeassistant.config_entries import ConfigFlowResult
-from homeassistant.helpers import config_entry_oauth2_flow
+from aiohttp import ClientResponse, ClientTimeout
+from homeassistant.components import webhook
+from homeassistant.config_entries import ConfigEntry, ConfigFlowResult, OptionsFlow
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_entry_oauth2_flow, selector
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.config_entry_oauth2_flow import LocalOAuth2Implementation
 
-from .const import DOMAIN, TraktUserProfile
+from .const import (
+    API_URL,
+    CONF_IMAGE_SIZE,
+    CONF_PROXY_IMAGES,
+    CONF_PUSH_UPDATES,
+    CONF_SCROBBLE_ENTITIES,
+    CONF_WEBHOOK_ID,
+    DEFAULT_IMAGE_SIZE,
+    DOMAIN,
+    TMDB_IMAGE_SIZES,
+    TraktUserProfile,
+)
+from .requester import RequestError, async_get_requester
 
 STEP_TMDB_DATA_SCHEMA = vol.Schema(
     {
@@ -32,15 +46,25 @@ class OAuth2FlowHandler(
         """Return logger."""
         return logging.getLogger(__name__)
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Return the options flow."""
+        return TraktOptionsFlow()
+
     async def async_oauth_create_entry(self, data: dict[str, Any]) -> ConfigFlowResult:
         self.data = data
 
         implementation = cast(LocalOAuth2Implementation, self.flow_impl)
-        profile = await trakt_user_profile(
-            async_get_clientsession(self.hass),
-            implementation.client_id,
-            data["token"]["access_token"],
-        )
+        try:
+            profile = await trakt_user_profile(
+                self.hass,
+                implementation.client_id,
+                data["token"]["access_token"],
+            )
+        except RequestError as err:
+            self.logger.error("Failed to load Trakt profile: %s", err)
+            return self.async_abort(reason="cannot_connect")
         data["username"] = profile["username"]
         logging.info("Trakt username: %s", data["username"])
 
@@ -69,17 +93,76 @@ class OAuth2FlowHandler(
         return result
 
 
+class TraktOptionsFlow(OptionsFlow):
+    """Handle Trakt options."""
+
+    webhook_id: str | None = None
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        entry = self.hass.config_entries.async_get_entry(self.handler)
+        options = entry.options if entry else {}
+        # Kept on the flow so the URL shown in the form is the one saved
+        if self.webhook_id is None:
+            self.webhook_id = (
+                options.get(CONF_WEBHOOK_ID) or webhook.async_generate_id()
+            )
+        webhook_id = self.webhook_id
+
+        if user_input is not None:
+            return self.async_create_entry(
+                data={**user_input, CONF_WEBHOOK_ID: webhook_id}
+            )
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_PROXY_IMAGES,
+                        default=options.get(CONF_PROXY_IMAGES, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_IMAGE_SIZE,
+                        default=options.get(CONF_IMAGE_SIZE, DEFAULT_IMAGE_SIZE),
+                    ): vol.In(TMDB_IMAGE_SIZES),
+                    vol.Optional(
+                        CONF_PUSH_UPDATES,
+                        default=options.get(CONF_PUSH_UPDATES, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_SCROBBLE_ENTITIES,
+                        default=options.get(CONF_SCROBBLE_ENTITIES, []),
+                    ): selector.EntitySelector(
+                        selector.EntitySelectorConfig(
+                            domain="media_player", multiple=True
+                        )
+                    ),
+                }
+            ),
+            description_placeholders={
+                "webhook_url": webhook.async_generate_url(self.hass, webhook_id)
+            },
+        )
+
+
 async def trakt_user_profile(
-    session: ClientSession,
+    hass: HomeAssistant,
     client_id: str,
     access_token: str,
 ) -> TraktUserProfile:
-    url = "https://api.trakt.tv/users/me"
+    session = async_get_clientsession(hass)
+    url = f"{API_URL}/users/me"
     headers = {
         "Content-Type": "application/json",
         "trakt-api-key": client_id,
         "trakt-api-version": "2",
         "Authorization": f"Bearer {access_token}",
     }
-    response = await session.get(url, headers=headers)
+
+    async def send(timeout: ClientTimeout) -> ClientResponse:
+        return await session.get(url, headers=headers, timeout=timeout)
+
+    response = await async_get_requester(hass).async_request(url, send)
     return cast(TraktUserProfile, await response.json())
@@ -1,12 +1,15 @@
 """Constants for the Trakt integration."""
 
 import logging
-from datetime import timedelta
-from typing import Final, Literal, TypedDict
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Final, Literal, NotRequired, TypedDict
 
 DOMAIN: Final = "trakt"
 
 API_URL = "https://api.trakt.tv"
+TMDB_API_URL = "https://api.themoviedb.org/3"
+TMDB_IMAGE_URL = "https://image.tmdb.org/t/p"
 
 OAUTH2_AUTHORIZE = "https://api.trakt.tv/oauth/authorize"
 OAUTH2_TOKEN = "https://api.trakt.tv/oauth/token"
@@ -14,6 +17,120 @@ OAUTH2_TOKEN = "https://api.trakt.tv/oauth/token"
 LOGGER = logging.getLogger(__package__)
 SCAN_INTERVAL = timedelta(minutes=1)
 
+POLL_MIN_INTERVAL = timedelta(seconds=15)
+POLL_END_WINDOW = timedelta(minutes=2)
+POLL_OVERRUN_INTERVAL = timedelta(seconds=30)
+POLL_MAX_PLAYING_INTERVAL = timedelta(minutes=10)
+POLL_IDLE_INTERVAL = timedelta(minutes=1)
+POLL_IDLE_MAX_INTERVAL = timedelta(minutes=5)
+POLL_PUSH_IDLE_INTERVAL = timedelta(minutes=15)
+PUSH_REFRESH_COOLDOWN = 5
+
+CONF_PROXY_IMAGES: Final = "proxy_images"
+CONF_IMAGE_SIZE: Final = "image_size"
+CONF_PUSH_UPDATES: Final = "push_updates"
+CONF_WEBHOOK_ID: Final = "webhook_id"
+CONF_SCROBBLE_ENTITIES: Final = "scrobble_entities"
+TMDB_IMAGE_SIZES: Final = ["w300", "w500", "w780", "w1280", "original"]
+DEFAULT_IMAGE_SIZE: Final = "w500"
+
+DATA_IMAGE_CACHE: Final = f"{DOMAIN}_image_cache"
+IMAGE_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+DATA_RATE_LIMITERS: Final = f"{DOMAIN}_rate_limiters"
+
+RATELIMIT_LIMIT = 1000
+RATELIMIT_PERIOD = 300
+# AUTHED_API_POST_LIMIT, shared by POST, PUT and DELETE
+RATELIMIT_POST_LIMIT = 1
+RATELIMIT_POST_PERIOD = 1
+LOW_PRIORITY_RESERVE = 0.1
+LOW_PRIORITY_MAX_DELAY = 5
+
+DATA_REQUESTER: Final = f"{DOMAIN}_requester"
+DATA_SHARED_CACHE: Final = f"{DOMAIN}_shared_cache"
+DATA_SESSION: Final = f"{DOMAIN}_session"
+
+SESSION_LIMIT_PER_HOST = 8
+SESSION_KEEPALIVE_TIMEOUT = 60
+SESSION_DNS_CACHE_TTL = 300
+
+HOST_TIMEOUTS: Final = {"api.trakt.tv": 10, "api.themoviedb.org": 5}
+DEFAULT_HOST_TIMEOUT = 10
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 0.5
+RETRY_MAX_DELAY = 30
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 120
+CONDITIONAL_CACHE_MAX_SIZE = 64
+
+TOKEN_REFRESH_AHEAD = 3600
+TOKEN_EXPIRY_MARGIN = 20
+TOKEN_REFRESH_ATTEMPTS = 3
+TOKEN_REFRESH_COOLDOWN = 300
+
+PREFETCH_THRESHOLD = 0.75
+PREFETCH_MAX_TRACKED = 64
+
+MAX_CONCURRENT_REQUESTS = 4
+REQUEST_TIMEOUT = 20
+
+CACHE_STORAGE_VERSION = 1
+CACHE_MAX_SIZE = 1024
+CACHE_TTL = timedelta(days=7)
+CACHE_SAVE_DELAY = 30
+
+HISTORY_SYNC_INTERVAL = timedelta(minutes=15)
+HISTORY_PAGE_LIMIT = 250
+
+UP_NEXT_INTERVAL = timedelta(minutes=30)
+UP_NEXT_RECHECK = timedelta(days=1)
+SEASONS_CACHE_MAX_SIZE = 512
+
+ACCOUNT_CHECK_INTERVAL = timedelta(minutes=15)
+ACCOUNT_STORAGE_VERSION = 1
+PROFILE_TTL = timedelta(days=1)
+STATS_TTL = timedelta(hours=6)
+WATCHLIST_TTL = timedelta(hours=1)
+
+BROWSE_PAGE_SIZE = 50
+BROWSE_CACHE_TTL = 60
+BROWSE_CACHE_MAX_SIZE = 32
+BROWSE_CALENDAR_DAYS = 14
+
+CALENDAR_WINDOW_DAYS = 14
+CALENDAR_WINDOW_TTL = 3600
+CALENDAR_PAST_WINDOW_TTL = 86400
+CALENDAR_MAX_WINDOWS = 26
+CALENDAR_EPISODE_RUNTIME = 60
+
+ID_INDEX_STORAGE_VERSION = 1
+ID_INDEX_SAVE_DELAY = 30
+ID_INDEX_MAX_SIZE = 50000
+ID_INDEX_BACKFILL_INTERVAL = timedelta(days=7)
+ID_INDEX_BACKFILL_CHECK_INTERVAL = timedelta(hours=6)
+
+WRITE_QUEUE_STORAGE_VERSION = 1
+WRITE_QUEUE_SAVE_DELAY = 1
+WRITE_FLUSH_DELAY = 5
+WRITE_FLUSH_INTERVAL = timedelta(minutes=5)
+WRITE_BATCH_SIZE = 500
+WRITE_LIVE_MAX_AGE = timedelta(hours=1)
+# Rejections that say nothing about the writes themselves: unauthorized,
+# forbidden, locked account and rate limited
+WRITE_RETRY_STATUSES = frozenset({401, 403, 423, 429})
+SCROBBLE_WATCHED_PROGRESS = 80
+SCROBBLE_MISS_MAX_SIZE = 256
+SCROBBLE_MISS_TTL = timedelta(days=1)
+
+STATE_STORAGE_VERSION = 1
+STATE_SAVE_DELAY = 10
+
+
+# Returns the current time in UTC. Coordinators take one so that the soak
+# benchmark can run them on simulated time.
+Clock = Callable[[], datetime]
+
 
 class TraktUserIDs(TypedDict):
     slug: str
@@ -26,11 +143,16 @@ class TraktUserProfile(TypedDict):
     vip: bool
     vip_ep: bool
     ids: TraktUserIDs
+    joined_at: NotRequired[str]
+    location: NotRequired[str | None]
 
 
 class TraktEpisodeIDs(TypedDict):
     trakt: int
     slug: str
+    tvdb: NotRequired[int | None]
+    imdb: NotRequired[str | None]
+    tmdb: NotRequired[int | None]
 
 
 class TraktEpisode(TypedDict):
@@ -39,24 +161,28 @@ class TraktEpisode(TypedDict):
     title: str
     ids: TraktEpisodeIDs
     runtime: int
-    tmdb_image_url: str
 
 
 class TraktShowIDs(TypedDict):
     trakt: int
     slug: str
+    tvdb: NotRequired[int | None]
+    imdb: NotRequired[str | None]
+    tmdb: NotRequired[int | None]
 
 
 class TraktShow(TypedDict):
     title: str
     year: int
     ids: TraktShowIDs
-    tmdb_image_url: str
 
 
 class TraktMovieIDs(TypedDict):
     trakt: int
     slug: str
+    tvdb: NotRequired[int | None]
+    imdb: NotRequired[str | None]
+    tmdb: NotRequired[int | None]
 
 
 class TraktMovie(TypedDict):
@@ -64,7 +190,6 @@ class TraktMovie(TypedDict):
     year: int
     ids: TraktMovieIDs
     runtime: int
-    tmdb_image_url: str
 
 
 class TraktWatchingEpisode(TypedDict):
@@ -87,6 +212,17 @@ class TraktWatchingMovie(TypedDict):
 TraktWatchingInfo = TraktWatchingEpisode | TraktWatchingMovie | None
 
 
+class TraktQueuedWrite(TypedDict):
+    kind: Literal["history", "checkin", "scrobble"]
+    media_type: Literal["movie", "episode"]
+    ids: dict[str, int | str]
+    queued_at: str
+    watched_at: NotRequired[str]
+    action: NotRequired[Literal["start", "pause", "stop"]]
+    progress: NotRequired[float]
+    message: NotRequired[str]
+
+
 class TraktRatelimitInfo(TypedDict):
     name: str
     period: int
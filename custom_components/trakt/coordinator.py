@@ -0,0 +1,870 @@
+"""Coordinators for the Trakt watching state, history, progress and account."""
+
+import asyncio
+import datetime as dt
+import json
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, replace
+from functools import partial
+from pathlib import Path
+from typing import Any, Literal, cast
+from urllib.parse import urlencode
+
+from aiohttp import ClientResponse, ClientSession, ClientTimeout
+from homeassistant.components.media_player.const import MediaType
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
+
+from .api import AsyncConfigEntryAuth
+from .artwork import ImageKind, image_size, select_artwork
+from .cache import TraktMetadataCache, TraktSharedCache, async_get_shared_cache
+from .const import (
+    ACCOUNT_CHECK_INTERVAL,
+    ACCOUNT_STORAGE_VERSION,
+    CONF_IMAGE_SIZE,
+    CONF_PROXY_IMAGES,
+    CONF_PUSH_UPDATES,
+    DEFAULT_IMAGE_SIZE,
+    DOMAIN,
+    HISTORY_PAGE_LIMIT,
+    HISTORY_SYNC_INTERVAL,
+    LOGGER,
+    MAX_CONCURRENT_REQUESTS,
+    POLL_IDLE_INTERVAL,
+    PREFETCH_THRESHOLD,
+    PROFILE_TTL,
+    PUSH_REFRESH_COOLDOWN,
+    REQUEST_TIMEOUT,
+    SEASONS_CACHE_MAX_SIZE,
+    STATE_SAVE_DELAY,
+    STATE_STORAGE_VERSION,
+    STATS_TTL,
+    TMDB_API_URL,
+    TMDB_IMAGE_URL,
+    UP_NEXT_INTERVAL,
+    UP_NEXT_RECHECK,
+    WATCHLIST_TTL,
+    Clock,
+    TraktEpisode,
+    TraktMovie,
+    TraktShow,
+)
+from .history import TraktHistoryDatabase
+from .idmap import TraktIdIndex
+from .models import (
+    TraktHistorySummary,
+    TraktNowPlaying,
+    TraktUpNext,
+    trim_metadata,
+    trim_seasons,
+)
+from .progress import find_next_episode, watched_marker
+from .ratelimit import RequestPriority, TraktRateLimitedError
+from .requester import (
+    CircuitOpenError,
+    RequestError,
+    async_get_session,
+)
+from .schedule import next_poll_interval
+from .writequeue import TraktWriteQueue
+
+
+def state_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding a config entry's last known watching state."""
+    return Store(hass, STATE_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.state")
+
+
+class TraktWatchingUpdateCoordinator(DataUpdateCoordinator[TraktNowPlaying | None]):
+    session: ClientSession
+    entry: ConfigEntry
+    entry_auth: AsyncConfigEntryAuth
+    shared_cache: TraktSharedCache
+    metadata_cache: TraktMetadataCache
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        entry_auth: AsyncConfigEntryAuth,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        request_timeout: float = REQUEST_TIMEOUT,
+        tmdb_api_url: str = TMDB_API_URL,
+        tmdb_image_url: str | None = None,
+        clock: Clock = dt_util.utcnow,
+    ) -> None:
+        super().__init__(
+            hass,
+            LOGGER,
+            name=DOMAIN,
+            update_interval=POLL_IDLE_INTERVAL,
+            always_update=False,
+            # Runs the first pushed event right away and folds any that
+            # follow within the cooldown into a single trailing refresh
+            request_refresh_debouncer=Debouncer(
+                hass, LOGGER, cooldown=PUSH_REFRESH_COOLDOWN, immediate=True
+            ),
+        )
+        self.session = async_get_session(self.hass)
+        self.entry = entry
+        self.entry_auth = entry_auth
+        self.tmdb_api_key = entry.data["tmdb_api_key"]
+        self.options = dict(entry.options)
+        self.image_size = entry.options.get(CONF_IMAGE_SIZE, DEFAULT_IMAGE_SIZE)
+        self.proxy_images = entry.options.get(CONF_PROXY_IMAGES, False)
+        self.push_updates = entry.options.get(CONF_PUSH_UPDATES, False)
+        self.tmdb_api_url = tmdb_api_url
+        self.tmdb_image_url = tmdb_image_url
+        self._clock = clock
+        # Title metadata and TMDB lookups are shared with the other accounts
+        self.shared_cache = async_get_shared_cache(hass)
+        self.metadata_cache = self.shared_cache.metadata
+        self.id_index = TraktIdIndex(hass, entry.entry_id)
+        self._store = state_store(hass, entry.entry_id)
+        self._request_semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._request_timeout = request_timeout
+        self._idle_polls = 0
+        self.last_success_time: dt.datetime | None = None
+
+    async def async_restore(self) -> None:
+        """Restore the metadata cache and last known state without any requests.
+
+        A saved snapshot whose playback has since expired is restored as idle.
+        """
+        await self.shared_cache.async_load()
+        await self.id_index.async_load()
+        stored = await self._store.async_load()
+        if not stored or not (saved := stored.get("now_playing")):
+            return
+
+        now_playing = TraktNowPlaying.from_dict(saved)
+        if now_playing.expires_at > self._clock():
+            self.data = now_playing
+
+    async def async_push_refresh(self) -> None:
+        """Refresh after a player reported a playback event."""
+        self._idle_polls = 0
+        await self.async_request_refresh()
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"now_playing": self.data.as_dict() if self.data else None}
+
+    async def _async_update_data(self) -> TraktNowPlaying | None:
+        data = await self._async_load_watching()
+        self._async_schedule_prefetch(data)
+        if data != self.data:
+            self._store.async_delay_save(self._data_to_save, STATE_SAVE_DELAY)
+
+        self._idle_polls = 0 if data else self._idle_polls + 1
+        interval = next_poll_interval(
+            data, self._idle_polls, self._clock(), self.push_updates
+        )
+        if interval != self.update_interval:
+            LOGGER.debug("Next Trakt poll in %s", interval)
+            self.update_interval = interval
+
+        return data
+
+    async def _async_load_watching(self) -> TraktNowPlaying | None:
+        try:
+            watching = await self.entry_auth.async_get_json("/users/me/watching")
+        except CircuitOpenError as err:
+            LOGGER.debug("Serving last known watching state: %s", err)
+            return self.data
+        except RequestError as err:
+            raise UpdateFailed(str(err)) from err
+        self.last_success_time = self._clock()
+
+        if watching is None:
+            return None
+        self.id_index.add_payload(watching)
+
+        if watching["type"] == "episode":
+            artwork = self._async_start_artwork(
+                "tv",
+                watching["show"]["ids"].get("tmdb"),
+                watching["episode"]["season"],
+            )
+            episode, show = await asyncio.gather(
+                self._async_load_extended_info(
+                    type="episode",
+                    summary=watching["episode"],
+                ),
+                self._async_load_extended_info(
+                    type="show",
+                    summary=watching["show"],
+                ),
+            )
+            return self._now_playing_with_artwork(
+                partial(
+                    TraktNowPlaying.from_episode,
+                    watching,
+                    cast(TraktEpisode, episode),
+                    cast(TraktShow, show),
+                ),
+                artwork,
+                watching["episode"]["number"],
+            )
+
+        if watching["type"] == "movie":
+            artwork = self._async_start_artwork(
+                "movie", watching["movie"]["ids"].get("tmdb")
+            )
+            movie = await self._async_load_extended_info(
+                type="movie",
+                summary=watching["movie"],
+            )
+            return self._now_playing_with_artwork(
+                partial(TraktNowPlaying.from_movie, watching, cast(TraktMovie, movie)),
+                artwork,
+            )
+
+        return None
+
+    async def _async_load_extended_info(
+        self,
+        type: Literal["episode", "show", "movie"],
+        summary: dict[str, Any],
+    ) -> dict[str, Any]:
+        id = summary["ids"]["trakt"]
+        if (cached := self.metadata_cache.get(type, id)) is not None:
+            return cached
+
+        try:
+            async with (
+                self._request_semaphore,
+                asyncio.timeout(self._request_timeout),
+            ):
+                data = await self.entry_auth.async_get_json(
+                    f"/{type}s/{id}?extended=full",
+                    priority=RequestPriority.LOW,
+                    shared=True,
+                )
+        except (TimeoutError, TraktRateLimitedError, RequestError) as err:
+            LOGGER.debug("Using last known %s info for %s: %r", type, id, err)
+            return self.metadata_cache.get_stale(type, id) or summary
+        self.id_index.add(type, data)
+        data = trim_metadata(type, data)
+        self.metadata_cache.set(type, id, data)
+        return data
+
+    @callback
+    def _async_start_artwork(
+        self,
+        media: Literal["tv", "movie"],
+        tmdb_id: int | None,
+        season: int | None = None,
+    ) -> asyncio.Task[dict[str, Any] | None]:
+        """Start the TMDB artwork lookup alongside the Trakt lookups.
+
+        The task starts eagerly, so cached artwork is ready right away.
+        """
+        return self.entry.async_create_background_task(
+            self.hass,
+            self._async_optional_artwork(media, tmdb_id, season),
+            name=f"{DOMAIN} artwork",
+            eager_start=True,
+        )
+
+    def _now_playing_with_artwork(
+        self,
+        build: Callable[[str | None], TraktNowPlaying],
+        artwork: asyncio.Task[dict[str, Any] | None],
+        episode_number: int | None = None,
+    ) -> TraktNowPlaying:
+        """Build the watching state without waiting on TMDB.
+
+        Artwork that is still loading is filled in by a follow-up update, and
+        until then the image already shown for the same item is kept.
+        """
+        if artwork.done():
+            return build(self._artwork_image_url(artwork.result(), episode_number))
+
+        now_playing = build(None)
+        if self.data is not None and self.data.content_id == now_playing.content_id:
+            now_playing = replace(now_playing, image_url=self.data.image_url)
+        artwork.add_done_callback(
+            partial(self._async_artwork_loaded, now_playing, episode_number)
+        )
+        return now_playing
+
+    @callback
+    def _async_artwork_loaded(
+        self,
+        now_playing: TraktNowPlaying,
+        episode_number: int | None,
+        artwork: asyncio.Task[dict[str, Any] | None],
+    ) -> None:
+        # A later update may have replaced the state in the meantime
+        if artwork.cancelled() or self.data is not now_playing:
+            return
+        image_url = self._artwork_image_url(artwork.result(), episode_number)
+        if image_url is None or image_url == now_playing.image_url:
+            return
+        self.async_set_updated_data(replace(now_playing, image_url=image_url))
+        self._store.async_delay_save(self._data_to_save, STATE_SAVE_DELAY)
+
+    async def _async_optional_artwork(
+        self,
+        media: Literal["tv", "movie"],
+        tmdb_id: int | None,
+        season: int | None = None,
+    ) -> dict[str, Any] | None:
+        """Look up TMDB artwork without letting TMDB fail or stall the update."""
+        if not self.tmdb_api_key or not tmdb_id:
+            return None
+
+        artwork: dict[str, Any] | None
+        try:
+            artwork, _ = await asyncio.gather(
+                self._async_artwork(media, tmdb_id, season),
+                self._async_tmdb_configuration(),
+            )
+        except (TimeoutError, RequestError) as err:
+            LOGGER.debug(
+                "TMDB artwork lookup failed for %s %s: %r", media, tmdb_id, err
+            )
+            return None
+        return artwork
+
+    async def _async_artwork(
+        self,
+        media: Literal["tv", "movie"],
+        tmdb_id: int,
+        season: int | None = None,
+    ) -> dict[str, Any]:
+        """Return the artwork of a movie, or of a show and one of its seasons.
+
+        A single request appends the images, and the season with every
+        episode's still, to the title, so all episodes of a season share it.
+        """
+        key = f"{media}/{tmdb_id}" if season is None else f"tv/{tmdb_id}/{season}"
+        if (cached := self.metadata_cache.get("tmdb_artwork", key)) is not None:
+            return cached
+
+        language = self.hass.config.language.split("-")[0]
+        append = "images" if season is None else f"images,season/{season}"
+        # English images are the fallback when none exist in the user's language
+        languages = dict.fromkeys([language, "en", "null"])
+        query = urlencode(
+            {
+                "append_to_response": append,
+                "include_image_language": ",".join(languages),
+            }
+        )
+        data = await self._async_tmdb_get_json(
+            f"{self.tmdb_api_url}/{media}/{tmdb_id}?{query}"
+        )
+        artwork = select_artwork(data or {}, language, season)
+        self.metadata_cache.set("tmdb_artwork", key, artwork)
+        return artwork
+
+    async def _async_tmdb_configuration(self) -> None:
+        """Load the image base URL and sizes TMDB serves, once."""
+        if self.shared_cache.tmdb_configuration is not None:
+            return
+        if (cached := self.metadata_cache.get("tmdb", "configuration")) is None:
+            data = await self._async_tmdb_get_json(f"{self.tmdb_api_url}/configuration")
+            images = (data or {}).get("images", {})
+            cached = {
+                "base_url": images.get("secure_base_url"),
+                "sizes": {
+                    kind: images.get(f"{kind}_sizes")
+                    for kind in ("backdrop", "poster", "still")
+                },
+            }
+            self.metadata_cache.set("tmdb", "configuration", cached)
+        self.shared_cache.tmdb_configuration = cached
+
+    def _artwork_image_url(
+        self,
+        artwork: dict[str, Any] | None,
+        episode_number: int | None = None,
+    ) -> str | None:
+        if artwork is None:
+            return None
+        if episode_number is not None and (
+            still := artwork["stills"].get(str(episode_number))
+        ):
+            return self._tmdb_image_url("still", still)
+        if artwork["backdrop"]:
+            return self._tmdb_image_url("backdrop", artwork["backdrop"])
+        if artwork["poster"]:
+            return self._tmdb_image_url("poster", artwork["poster"])
+        return None
+
+    def _tmdb_image_url(self, kind: ImageKind, file_path: str) -> str:
+        configuration = self.shared_cache.tmdb_configuration or {}
+        base_url = (
+            self.tmdb_image_url
+            or (configuration.get("base_url") or "").rstrip("/")
+            or TMDB_IMAGE_URL
+        )
+        size = image_size(configuration.get("sizes", {}).get(kind), self.image_size)
+        return f"{base_url}/{size}{file_path}"
+
+    async def _async_tmdb_get_json(self, url: str) -> Any:
+        async def send(
+            timeout: ClientTimeout, headers: dict[str, str]
+        ) -> ClientResponse:
+            return await self.session.get(
+                url,
+                params={"api_key": self.tmdb_api_key},
+                headers={"Accept": "application/json", **headers},
+                timeout=timeout,
+            )
+
+        async with self._request_semaphore, asyncio.timeout(self._request_timeout):
+            return await self.entry_auth.requester.async_get_json(
+                url,
+                send,
+                self.shared_cache.tmdb_conditional_cache,
+                self.entry_auth.stats,
+                shared=True,
+            )
+
+    @callback
+    def _async_schedule_prefetch(self, now_playing: TraktNowPlaying | None) -> None:
+        """Warm caches for the next episode once playback passes a threshold."""
+        if now_playing is None or now_playing.media_type != MediaType.EPISODE:
+            return
+        if not (runtime := now_playing.runtime):
+            return
+
+        threshold = now_playing.started_at + dt.timedelta(
+            minutes=runtime * PREFETCH_THRESHOLD
+        )
+        if self._clock() < threshold:
+            return
+
+        if not self.shared_cache.claim_prefetch(now_playing.content_id):
+            return
+        self.entry.async_create_background_task(
+            self.hass,
+            self._async_prefetch_next_episode(now_playing),
+            name=f"{DOMAIN} prefetch next episode",
+        )
+
+    async def _async_prefetch_next_episode(self, now_playing: TraktNowPlaying) -> None:
+        season = cast(int, now_playing.season_number)
+        try:
+            if not await self._async_prefetch_season(
+                now_playing, season, after=cast(int, now_playing.episode_number)
+            ):
+                await self._async_prefetch_season(now_playing, season + 1, after=0)
+        except (TimeoutError, RequestError, TraktRateLimitedError) as err:
+            LOGGER.debug("Failed to prefetch next episode: %s", err)
+
+    async def _async_prefetch_season(
+        self,
+        now_playing: TraktNowPlaying,
+        season: int,
+        after: int,
+    ) -> bool:
+        """Cache a season's episodes, returning whether one follows `after`."""
+        show_id = now_playing.show_trakt_id
+        async with self._request_semaphore, asyncio.timeout(self._request_timeout):
+            episodes = await self.entry_auth.async_get_json(
+                f"/shows/{show_id}/seasons/{season}?extended=full",
+                priority=RequestPriority.LOW,
+                shared=True,
+            )
+        if show_id is not None:
+            self.id_index.add_episodes(show_id, episodes or [])
+        for next_episode in episodes or []:
+            self.metadata_cache.set(
+                "episode",
+                next_episode["ids"]["trakt"],
+                trim_metadata("episode", next_episode),
+            )
+        if not any(next_episode["number"] > after for next_episode in episodes or []):
+            return False
+
+        tmdb_id = now_playing.show_tmdb_id
+        if self.tmdb_api_key and tmdb_id:
+            await self._async_artwork("tv", tmdb_id, season)
+        return True
+
+
+def history_database_path(hass: HomeAssistant, entry_id: str) -> Path:
+    """Return the path of a config entry's history database."""
+    return Path(hass.config.path(".storage", f"{DOMAIN}.{entry_id}.history.db"))
+
+
+class TraktHistoryUpdateCoordinator(DataUpdateCoordinator[TraktHistorySummary]):
+    """Incrementally sync watch history into a local database.
+
+    /sync/last_activities is polled and /sync/history is only paged through
+    when its watched_at timestamp for movies or episodes has advanced, starting
+    from the timestamp of the previous sync. Progress is saved after every
+    page, so an interrupted sync resumes where it stopped next time.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        entry_auth: AsyncConfigEntryAuth,
+        id_index: TraktIdIndex,
+    ) -> None:
+        super().__init__(
+            hass,
+            LOGGER,
+            name=f"{DOMAIN} history",
+            update_interval=HISTORY_SYNC_INTERVAL,
+            always_update=False,
+        )
+        self.entry_auth = entry_auth
+        self.id_index = id_index
+        self.database = TraktHistoryDatabase(
+            history_database_path(hass, entry.entry_id)
+        )
+
+    async def async_restore(self) -> None:
+        """Load the summary of the history synced so far."""
+        self.data = await self.hass.async_add_executor_job(self.database.summary)
+
+    async def _async_update_data(self) -> TraktHistorySummary:
+        try:
+            activities = await self.entry_auth.async_get_json(
+                "/sync/last_activities", priority=RequestPriority.LOW
+            )
+            for type in ("movies", "episodes"):
+                await self._async_sync(type, activities[type]["watched_at"])
+        except (CircuitOpenError, TraktRateLimitedError) as err:
+            LOGGER.debug("Postponing history sync: %s", err)
+        except RequestError as err:
+            raise UpdateFailed(str(err)) from err
+
+        return await self.hass.async_add_executor_job(self.database.summary)
+
+    async def _async_sync(self, type: str, watched_at: str) -> None:
+        key = f"{type}.watched_at"
+        progress_key = f"{type}.progress"
+        # An interrupted sync first finishes its own range, then the rest
+        while (
+            synced_at := await self.hass.async_add_executor_job(
+                self.database.get_state, key
+            )
+        ) != watched_at:
+            progress = await self.hass.async_add_executor_job(
+                self.database.get_state, progress_key
+            )
+            target, end_at, page = (
+                json.loads(progress) if progress else (watched_at, watched_at, 1)
+            )
+            added = await self._async_sync_range(type, synced_at, target, end_at, page)
+            await self.hass.async_add_executor_job(
+                self.database.set_state, {key: target, progress_key: None}
+            )
+            LOGGER.debug("Synced %d %s history items", added, type)
+
+    async def _async_sync_range(
+        self,
+        type: str,
+        synced_at: str | None,
+        target: str,
+        end_at: str,
+        page: int,
+    ) -> int:
+        """Page through history from end_at back to synced_at, newest first.
+
+        After each stored page, end_at moves to its oldest item and is saved,
+        so an attempt cut short by the rate limiter resumes from there.
+        """
+        added = 0
+        while True:
+            params = {"end_at": end_at, "page": str(page)}
+            if synced_at is not None:
+                params["start_at"] = synced_at
+            query = urlencode({**params, "limit": str(HISTORY_PAGE_LIMIT)})
+            items = await self.entry_auth.async_get_json(
+                f"/sync/history/{type}?{query}",
+                priority=RequestPriority.LOW,
+                revalidate=False,
+            )
+            items = items or []
+            self.id_index.add_payload(items)
+            added += await self.hass.async_add_executor_job(self.database.add, items)
+            if len(items) < HISTORY_PAGE_LIMIT:
+                return added
+
+            # Items at the boundary are fetched twice and ignored the second
+            # time; a page sharing a single timestamp pages on instead
+            oldest = items[-1]["watched_at"]
+            end_at, page = (end_at, page + 1) if oldest == end_at else (oldest, 1)
+            await self.hass.async_add_executor_job(
+                self.database.set_state,
+                {f"{type}.progress": json.dumps([target, end_at, page])},
+            )
+
+
+class TraktUpNextUpdateCoordinator(DataUpdateCoordinator[list[TraktUpNext]]):
+    """Compute the next episode of every in-progress show locally.
+
+    A single /sync/watched/shows request gives the watched episodes of every
+    show. Combined with each show's season structure, cached in a store of
+    its own, it is enough to find the next episode without a progress
+    request per show. Only shows whose watched state changed, or that were
+    last checked over a day ago, are recomputed, and a show with no next
+    episode refetches seasons cached before its last check, so newly aired
+    episodes show up.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        entry_auth: AsyncConfigEntryAuth,
+        id_index: TraktIdIndex,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        clock: Clock = dt_util.utcnow,
+    ) -> None:
+        super().__init__(
+            hass,
+            LOGGER,
+            name=f"{DOMAIN} up next",
+            update_interval=UP_NEXT_INTERVAL,
+            always_update=False,
+        )
+        self.entry_auth = entry_auth
+        self.seasons_cache = TraktMetadataCache(
+            hass, entry.entry_id, max_size=SEASONS_CACHE_MAX_SIZE, name="seasons"
+        )
+        self.id_index = id_index
+        self._clock = clock
+        self._request_semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._watched: list[dict[str, Any]] | None = None
+        # show id -> (watched marker, checked at, next episode)
+        self._progress: dict[int, tuple[str, dt.datetime, TraktUpNext | None]] = {}
+
+    async def async_restore(self) -> None:
+        """Load the cached season structures."""
+        await self.seasons_cache.async_load()
+
+    async def _async_update_data(self) -> list[TraktUpNext]:
+        try:
+            watched = await self.entry_auth.async_get_json(
+                "/sync/watched/shows", priority=RequestPriority.LOW
+            )
+        except (CircuitOpenError, TraktRateLimitedError) as err:
+            LOGGER.debug("Postponing up next refresh: %s", err)
+            return self.data or []
+        except RequestError as err:
+            raise UpdateFailed(str(err)) from err
+
+        now = self._clock()
+        # A revalidated response is the same object as last time
+        if watched is self._watched and not any(
+            now - checked_at >= UP_NEXT_RECHECK
+            for _, checked_at, _ in self._progress.values()
+        ):
+            return self.data
+        self._watched = watched
+        self.id_index.add_payload(watched)
+
+        items = {item["show"]["ids"]["trakt"]: item for item in watched or []}
+        for show_id in self._progress.keys() - items.keys():
+            del self._progress[show_id]
+
+        stale = [
+            item
+            for show_id, item in items.items()
+            if (progress := self._progress.get(show_id)) is None
+            or progress[0] != watched_marker(item)
+            or now - progress[1] >= UP_NEXT_RECHECK
+        ]
+        await asyncio.gather(*(self._async_update_show(item, now) for item in stale))
+
+        return sorted(
+            (up_next for _, _, up_next in self._progress.values() if up_next),
+            key=lambda up_next: up_next.last_watched_at,
+            reverse=True,
+        )
+
+    async def _async_update_show(self, item: dict[str, Any], now: dt.datetime) -> None:
+        show = item["show"]
+        show_id = show["ids"]["trakt"]
+        watched_seasons = item.get("seasons", [])
+        try:
+            seasons, fetched_at = await self._async_load_seasons(show_id)
+            found = find_next_episode(seasons, watched_seasons, now)
+            # Caught up on what was known, so look for newly aired episodes
+            if found is None and now - fetched_at >= UP_NEXT_RECHECK:
+                seasons, _ = await self._async_load_seasons(show_id, refetch=True)
+                found = find_next_episode(seasons, watched_seasons, now)
+        except (TimeoutError, RequestError, TraktRateLimitedError) as err:
+            # Keep the previous result and retry on the next refresh
+            LOGGER.debug("Failed to load seasons of show %s: %s", show_id, err)
+            return
+
+        up_next = None
+        if found:
+            season, episode = found
+            first_aired = episode.get("first_aired")
+            up_next = TraktUpNext(
+                show_trakt_id=show_id,
+                show_title=show["title"],
+                episode_trakt_id=episode["ids"]["trakt"],
+                season=season,
+                number=episode["number"],
+                title=episode.get("title"),
+                first_aired=first_aired and dt.datetime.fromisoformat(first_aired),
+                last_watched_at=dt.datetime.fromisoformat(item["last_watched_at"]),
+            )
+        self._progress[show_id] = (watched_marker(item), now, up_next)
+
+    async def _async_load_seasons(
+        self, show_id: int, refetch: bool = False
+    ) -> tuple[list[dict[str, Any]], dt.datetime]:
+        """Return a show's seasons and when they were fetched."""
+        if (
+            not refetch
+            and (cached := self.seasons_cache.get("seasons", show_id)) is not None
+        ):
+            return (
+                cast(list[dict[str, Any]], cached["seasons"]),
+                dt.datetime.fromisoformat(cached["fetched_at"]),
+            )
+
+        async with self._request_semaphore, asyncio.timeout(REQUEST_TIMEOUT):
+            data = await self.entry_auth.async_get_json(
+                f"/shows/{show_id}/seasons?extended=full,episodes",
+                priority=RequestPriority.LOW,
+                shared=True,
+                revalidate=False,
+            )
+        for season in data or []:
+            self.id_index.add_episodes(show_id, season.get("episodes", []))
+        seasons = trim_seasons(data or [])
+        fetched_at = self._clock()
+        self.seasons_cache.set(
+            "seasons",
+            show_id,
+            {"seasons": seasons, "fetched_at": fetched_at.isoformat()},
+        )
+        return seasons, fetched_at
+
+
+def account_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding a config entry's cached account data."""
+    return Store(hass, ACCOUNT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.account")
+
+
+class TraktAccountUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Rarely changing account data, with each tier refreshed on its own TTL.
+
+    Tiers are persisted with the time they were fetched, so the saved values
+    are served right after a restart. Each update refetches only the tiers
+    older than their TTL, at low priority, and a tier whose refresh fails
+    keeps serving its previous value.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        entry_auth: AsyncConfigEntryAuth,
+        clock: Clock = dt_util.utcnow,
+    ) -> None:
+        super().__init__(
+            hass,
+            LOGGER,
+            name=f"{DOMAIN} account",
+            update_interval=ACCOUNT_CHECK_INTERVAL,
+            always_update=False,
+        )
+        self.entry_auth = entry_auth
+        self._clock = clock
+        self.fetched_at: dict[str, dt.datetime] = {}
+        self._store = account_store(hass, entry.entry_id)
+        self._tiers: dict[str, tuple[dt.timedelta, Callable[[], Awaitable[Any]]]] = {
+            "profile": (
+                PROFILE_TTL,
+                partial(entry_auth.async_user_profile, RequestPriority.LOW),
+            ),
+            "stats": (
+                STATS_TTL,
+                partial(
+                    entry_auth.async_get_json, "/users/me/stats", RequestPriority.LOW
+                ),
+            ),
+            "watchlist": (WATCHLIST_TTL, self._async_load_watchlist),
+        }
+
+    async def async_restore(self) -> None:
+        """Restore the account data saved by the last run."""
+        if not (stored := await self._store.async_load()):
+            return
+        self.data = stored["data"]
+        self.fetched_at = {
+            key: dt.datetime.fromisoformat(fetched_at)
+            for key, fetched_at in stored["fetched_at"].items()
+        }
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "data": self.data,
+            "fetched_at": {
+                key: fetched_at.isoformat()
+                for key, fetched_at in self.fetched_at.items()
+            },
+        }
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        now = self._clock()
+        stale = [
+            key
+            for key, (ttl, _) in self._tiers.items()
+            if key not in self.fetched_at or now - self.fetched_at[key] >= ttl
+        ]
+        if not stale:
+            return self.data
+
+        results = await asyncio.gather(
+            *(self._tiers[key][1]() for key in stale), return_exceptions=True
+        )
+        data = dict(self.data or {})
+        for key, result in zip(stale, results, strict=True):
+            if isinstance(result, TraktRateLimitedError | RequestError):
+                LOGGER.debug("Serving cached Trakt %s: %s", key, result)
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            data[key] = result
+            self.fetched_at[key] = now
+
+        if not data:
+            raise UpdateFailed("Failed to load Trakt account data")
+        self._store.async_delay_save(self._data_to_save, STATE_SAVE_DELAY)
+        return data
+
+    async def _async_load_watchlist(self) -> dict[str, int]:
+        movies, shows = await asyncio.gather(
+            self.entry_auth.async_get_item_count(
+                "/sync/watchlist/movies", RequestPriority.LOW
+            ),
+            self.entry_auth.async_get_item_count(
+                "/sync/watchlist/shows", RequestPriority.LOW
+            ),
+        )
+        return {"movies": movies, "shows": shows}
+
+
+@dataclass
+class TraktData:
+    """Coordinators of a config entry."""
+
+    watching: TraktWatchingUpdateCoordinator
+    history: TraktHistoryUpdateCoordinator
+    up_next: TraktUpNextUpdateCoordinator
+    account: TraktAccountUpdateCoordinator
+    queue: TraktWriteQueue
@@ -0,0 +1,69 @@
+"""Diagnostics support for Trakt."""
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_WEBHOOK_ID, DOMAIN
+from .coordinator import TraktData
+from .requester import async_get_requester
+
+TO_REDACT = {"token", "tmdb_api_key", CONF_WEBHOOK_ID}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: TraktData = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data.watching
+    entry_auth = coordinator.entry_auth
+    cache = coordinator.metadata_cache
+    requester = async_get_requester(hass)
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "last_success_time": coordinator.last_success_time,
+            "update_interval": coordinator.update_interval,
+            "now_playing": coordinator.data and coordinator.data.as_dict(),
+        },
+        "history": {
+            "last_update_success": data.history.last_update_success,
+            "summary": data.history.data and asdict(data.history.data),
+        },
+        "up_next": {
+            "last_update_success": data.up_next.last_update_success,
+            "shows": len(data.up_next.data or []),
+            "cached_seasons": len(data.up_next.seasons_cache),
+        },
+        "account": {
+            "last_update_success": data.account.last_update_success,
+            "fetched_at": data.account.fetched_at,
+        },
+        "queued_writes": len(data.queue),
+        "id_index": {
+            "size": len(coordinator.id_index),
+            "backfilled_at": coordinator.id_index.backfilled_at,
+        },
+        "requests": entry_auth.stats.as_dict(),
+        "metadata_cache": {
+            "size": len(cache),
+            "hits": cache.hits,
+            "misses": cache.misses,
+        },
+        "ratelimit": {
+            method: {
+                "limit": bucket.limit,
+                "period": bucket.period,
+                "remaining": bucket.remaining,
+            }
+            for method, bucket in entry_auth.rate_limiter.buckets.items()
+        },
+        "circuit_breakers": requester.as_dict(),
+        "coalesced_requests": requester.coalesced,
+    }
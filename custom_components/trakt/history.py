@@ -0,0 +1,155 @@
+"""Local SQLite store of a user's Trakt watch history."""
+
+import datetime as dt
+import sqlite3
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from .models import TraktHistorySummary, episode_title
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    watched_at TEXT NOT NULL,
+    action TEXT NOT NULL,
+    type TEXT NOT NULL,
+    trakt_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    show_trakt_id INTEGER,
+    show_title TEXT,
+    season INTEGER,
+    number INTEGER
+);
+CREATE INDEX IF NOT EXISTS history_watched_at ON history (watched_at);
+CREATE INDEX IF NOT EXISTS history_item ON history (type, trakt_id);
+CREATE INDEX IF NOT EXISTS history_show ON history (show_trakt_id, season, number);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _row(item: dict[str, Any]) -> tuple[Any, ...]:
+    if item["type"] == "episode":
+        episode, show = item["episode"], item["show"]
+        return (
+            item["id"],
+            item["watched_at"],
+            item["action"],
+            "episode",
+            episode["ids"]["trakt"],
+            episode.get("title") or "",
+            show["ids"]["trakt"],
+            show["title"],
+            episode["season"],
+            episode["number"],
+        )
+    movie = item["movie"]
+    return (
+        item["id"],
+        item["watched_at"],
+        item["action"],
+        "movie",
+        movie["ids"]["trakt"],
+        movie["title"],
+        None,
+        None,
+        None,
+        None,
+    )
+
+
+class TraktHistoryDatabase:
+    """Indexed SQLite database of history items and sync cursors.
+
+    Every method blocks and must be run in the executor.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the database."""
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get_state(self, key: str) -> str | None:
+        """Return a stored sync cursor."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT value FROM sync_state WHERE key = ?", (key,))
+                .fetchone()
+            )
+        return row[0] if row else None
+
+    def set_state(self, values: Mapping[str, str | None]) -> None:
+        """Store sync cursors in one transaction, removing those set to None."""
+        with self._lock, self._connect() as connection:
+            for key, value in values.items():
+                if value is None:
+                    connection.execute("DELETE FROM sync_state WHERE key = ?", (key,))
+                else:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                        (key, value),
+                    )
+
+    def add(self, items: list[dict[str, Any]]) -> int:
+        """Insert history items, ignoring ones already stored."""
+        rows = [_row(item) for item in items if item["type"] in ("movie", "episode")]
+        with self._lock, self._connect() as connection:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return connection.total_changes - before
+
+    def summary(self) -> TraktHistorySummary:
+        """Return the last watched item and play counts."""
+        with self._lock:
+            connection = self._connect()
+            last = connection.execute(
+                "SELECT type, title, show_title, season, number, watched_at"
+                " FROM history ORDER BY watched_at DESC LIMIT 1"
+            ).fetchone()
+            plays = dict(
+                connection.execute(
+                    "SELECT type, COUNT(*) FROM history GROUP BY type"
+                ).fetchall()
+            )
+
+        if last is None:
+            return TraktHistorySummary(
+                movie_plays=plays.get("movie", 0),
+                episode_plays=plays.get("episode", 0),
+            )
+
+        type, title, show_title, season, number, watched_at = last
+        if type == "episode":
+            title = episode_title(show_title, season, number, title)
+        return TraktHistorySummary(
+            movie_plays=plays.get("movie", 0),
+            episode_plays=plays.get("episode", 0),
+            last_watched_title=title,
+            last_watched_type=type,
+            last_watched_at=dt.datetime.fromisoformat(watched_at),
+        )
@@ -0,0 +1,197 @@
+"""Persistent index from external ids and titles to Trakt ids."""
+
+import datetime as dt
+import re
+from collections import OrderedDict
+from typing import Any, Literal
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import AsyncConfigEntryAuth
+from .const import (
+    DOMAIN,
+    ID_INDEX_BACKFILL_INTERVAL,
+    ID_INDEX_MAX_SIZE,
+    ID_INDEX_SAVE_DELAY,
+    ID_INDEX_STORAGE_VERSION,
+)
+from .ratelimit import RequestPriority
+
+MediaKind = Literal["movie", "show", "episode"]
+MEDIA_KINDS: tuple[MediaKind, ...] = ("movie", "show", "episode")
+
+ID_TYPES = ("trakt", "imdb", "tmdb", "tvdb", "slug")
+
+
+def id_index_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding a config entry's id index."""
+    return Store(hass, ID_INDEX_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.ids")
+
+
+def normalize_title(title: str) -> str:
+    """Return a title reduced to lowercase letters and digits."""
+    return re.sub(r"[^0-9a-z]+", " ", title.casefold()).strip()
+
+
+class TraktIdIndex:
+    """Bounded LRU mapping external ids, titles and episode numbers to Trakt ids.
+
+    Filled from the payloads the coordinators fetch anyway, and backfilled
+    in bulk from the watched and watchlist lists, so most lookups resolve
+    locally without a /search request. Lookups mark a key used like additions
+    do, so evictions drop the mappings unused for longest.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        max_size: int = ID_INDEX_MAX_SIZE,
+    ) -> None:
+        """Initialize the index."""
+        self._store = id_index_store(hass, entry_id)
+        self._ids: OrderedDict[str, int] = OrderedDict()
+        self._max_size = max_size
+        self.backfilled_at: dt.datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    async def async_load(self) -> None:
+        """Load the persisted index."""
+        if not (stored := await self._store.async_load()):
+            return
+        self._ids = OrderedDict(stored["ids"])
+        if backfilled_at := stored.get("backfilled_at"):
+            self.backfilled_at = dt.datetime.fromisoformat(backfilled_at)
+
+    async def async_remove(self) -> None:
+        """Remove the persisted index."""
+        self._ids.clear()
+        await self._store.async_remove()
+
+    @property
+    def needs_backfill(self) -> bool:
+        """Return whether the bulk lists should be indexed again."""
+        return (
+            self.backfilled_at is None
+            or dt.datetime.now(dt.UTC) - self.backfilled_at
+            >= ID_INDEX_BACKFILL_INTERVAL
+        )
+
+    async def async_backfill(self, entry_auth: AsyncConfigEntryAuth) -> None:
+        """Index every watched and watchlisted title in a few bulk requests."""
+        for path in ("/sync/watched/movies", "/sync/watched/shows", "/sync/watchlist"):
+            self.add_payload(
+                await entry_auth.async_get_json(path, priority=RequestPriority.LOW)
+            )
+        self.backfilled_at = dt.datetime.now(dt.UTC)
+        self._async_schedule_save()
+
+    def _set(self, key: str, trakt_id: int) -> bool:
+        """Map a key to a Trakt id, returning whether the mapping changed."""
+        changed = self._ids.get(key) != trakt_id
+        self._ids[key] = trakt_id
+        self._ids.move_to_end(key)
+        return changed
+
+    @callback
+    def add(self, kind: MediaKind, item: dict[str, Any]) -> None:
+        """Index a movie, show or episode object with an ids block.
+
+        The index is only saved when a mapping was added or changed, so the
+        same payloads fetched on every poll do not rewrite it.
+        """
+        ids = item.get("ids") or {}
+        if not isinstance(trakt_id := ids.get("trakt"), int):
+            return
+        keys = [
+            f"{kind}:{id_type}:{value}"
+            for id_type in ID_TYPES
+            if (value := ids.get(id_type))
+        ]
+        if kind != "episode" and (title := item.get("title")):
+            keys.append(f"{kind}:title:{normalize_title(title)}")
+            if year := item.get("year"):
+                keys.append(f"{kind}:title:{normalize_title(title)}:{year}")
+        changed = False
+        for key in keys:
+            changed |= self._set(key, trakt_id)
+        if changed:
+            self._async_schedule_save()
+
+    @callback
+    def add_episodes(self, show_id: int, episodes: list[dict[str, Any]]) -> None:
+        """Index episodes of a show by id and by season and number."""
+        for episode in episodes:
+            self.add("episode", episode)
+            trakt_id = (episode.get("ids") or {}).get("trakt")
+            season, number = episode.get("season"), episode.get("number")
+            if (
+                isinstance(trakt_id, int)
+                and season is not None
+                and number is not None
+                and self._set(f"episode:{show_id}:{season}:{number}", trakt_id)
+            ):
+                self._async_schedule_save()
+
+    @callback
+    def add_payload(self, payload: Any) -> None:
+        """Index every movie, show and episode in a list of Trakt list items."""
+        items = payload if isinstance(payload, list) else [payload]
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            for kind in MEDIA_KINDS:
+                if isinstance(media := item.get(kind), dict):
+                    self.add(kind, media)
+            show, episode = item.get("show"), item.get("episode")
+            if (
+                isinstance(show, dict)
+                and isinstance(episode, dict)
+                and isinstance(show_id := (show.get("ids") or {}).get("trakt"), int)
+            ):
+                self.add_episodes(show_id, [episode])
+
+    def _get(self, key: str) -> int | None:
+        if (trakt_id := self._ids.get(key)) is not None:
+            self._ids.move_to_end(key)
+        return trakt_id
+
+    def lookup_ids(self, kind: MediaKind, ids: dict[str, Any]) -> int | None:
+        """Return the Trakt id of an item from any of its external ids."""
+        if isinstance(trakt_id := ids.get("trakt"), int):
+            return trakt_id
+        for id_type in ID_TYPES:
+            if (value := ids.get(id_type)) and (
+                trakt_id := self._get(f"{kind}:{id_type}:{value}")
+            ) is not None:
+                return trakt_id
+        return None
+
+    def lookup_title(
+        self, kind: MediaKind, title: str, year: int | None = None
+    ) -> int | None:
+        """Return the Trakt id of a movie or show by title, and year if known."""
+        key = f"{kind}:title:{normalize_title(title)}"
+        if year is not None and (trakt_id := self._get(f"{key}:{year}")):
+            return trakt_id
+        return self._get(key)
+
+    def lookup_episode(self, show_id: int, season: int, number: int) -> int | None:
+        """Return the Trakt id of an episode by its show, season and number."""
+        return self._get(f"episode:{show_id}:{season}:{number}")
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        while len(self._ids) > self._max_size:
+            self._ids.popitem(last=False)
+        self._store.async_delay_save(self._data_to_save, ID_INDEX_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "backfilled_at": self.backfilled_at and self.backfilled_at.isoformat(),
+            "ids": dict(self._ids),
+        }
@@ -0,0 +1,107 @@
+"""On-disk cache of TMDB artwork served through the entity image proxy."""
+
+import asyncio
+import hashlib
+import mimetypes
+import os
+from pathlib import Path
+
+from aiohttp import ClientError, ClientResponse, ClientTimeout
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_IMAGE_CACHE, DOMAIN, IMAGE_CACHE_MAX_BYTES, LOGGER
+from .requester import RequestError, async_get_requester, async_get_session
+
+
+class TraktImageCache:
+    """Size-bounded on-disk cache of images, evicting least recently used.
+
+    Concurrent requests for the same image share a single download.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        directory: Path,
+        max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+    ) -> None:
+        """Initialize the image cache."""
+        self._hass = hass
+        self._session = async_get_session(hass)
+        self._requester = async_get_requester(hass)
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._pending: dict[str, asyncio.Task[bytes | None]] = {}
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        suffix = Path(url).suffix
+        return self._directory / f"{digest}{suffix}"
+
+    async def async_get(self, url: str) -> tuple[bytes, str] | None:
+        """Return the image bytes and content type, downloading if needed."""
+        path = self._path(url)
+        content_type = mimetypes.guess_type(path.name)[0] or "image/jpeg"
+
+        data = await self._hass.async_add_executor_job(_read, path)
+        if data is None:
+            if (task := self._pending.get(url)) is None:
+                task = self._hass.async_create_task(self._async_download(url, path))
+                self._pending[url] = task
+            data = await asyncio.shield(task)
+
+        if data is None:
+            return None
+        return data, content_type
+
+    async def _async_download(self, url: str, path: Path) -> bytes | None:
+        async def send(timeout: ClientTimeout) -> ClientResponse:
+            return await self._session.get(url, timeout=timeout)
+
+        try:
+            response = await self._requester.async_request(url, send, expect_json=False)
+            data = await response.read()
+        except (TimeoutError, ClientError, RequestError) as err:
+            LOGGER.debug("Failed to download image %s: %s", url, err)
+            return None
+        finally:
+            self._pending.pop(url, None)
+
+        await self._hass.async_add_executor_job(
+            _write, self._directory, path, data, self._max_bytes
+        )
+        return data
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    os.utime(path)
+    return data
+
+
+def _write(directory: Path, path: Path, data: bytes, max_bytes: int) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+
+    files = [(file.stat(), file) for file in directory.iterdir() if file.is_file()]
+    total = sum(stat.st_size for stat, _ in files)
+    for stat, file in sorted(files, key=lambda item: item[0].st_mtime):
+        if total <= max_bytes:
+            break
+        file.unlink(missing_ok=True)
+        total -= stat.st_size
+
+
+@callback
+def async_get_image_cache(hass: HomeAssistant) -> TraktImageCache:
+    """Return the image cache shared by all config entries."""
+    if DATA_IMAGE_CACHE not in hass.data:
+        directory = Path(hass.config.path(".cache", DOMAIN, "images"))
+        hass.data[DATA_IMAGE_CACHE] = TraktImageCache(hass, directory)
+    image_cache: TraktImageCache = hass.data[DATA_IMAGE_CACHE]
+    return image_cache
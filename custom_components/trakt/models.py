@@ -0,0 +1,183 @@
+"""Models for the Trakt integration."""
+
+import datetime as dt
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Self
+
+from homeassistant.components.media_player.const import MediaType
+
+from .const import (
+    TraktEpisode,
+    TraktMovie,
+    TraktShow,
+    TraktWatchingEpisode,
+    TraktWatchingMovie,
+)
+
+# Fields of the extended=full payloads the integration reads; everything
+# else is dropped before the payloads are cached.
+METADATA_FIELDS: dict[str, tuple[str, ...]] = {
+    "episode": ("season", "number", "title", "ids", "runtime"),
+    "show": ("title", "year", "ids"),
+    "movie": ("title", "year", "ids", "runtime"),
+}
+
+
+def trim_metadata(type: str, data: dict[str, Any]) -> dict[str, Any]:
+    """Return only the fields of an extended=full payload that are used."""
+    return {key: data[key] for key in METADATA_FIELDS[type] if key in data}
+
+
+def trim_seasons(seasons: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Return the episode structure of a show's seasons, without specials."""
+    return [
+        {
+            "number": season["number"],
+            "episodes": [
+                {
+                    "number": episode["number"],
+                    "title": episode.get("title"),
+                    "ids": {"trakt": episode["ids"]["trakt"]},
+                    "first_aired": episode.get("first_aired"),
+                }
+                for episode in season.get("episodes", [])
+            ],
+        }
+        for season in seasons
+        if season["number"] > 0
+    ]
+
+
+def episode_title(show_title: str, season: int, number: int, title: str) -> str:
+    """Return the display title of an episode."""
+    return f"{show_title} | S{season} E{number} - {title}"
+
+
+def _ends_at(
+    started_at: dt.datetime, expires_at: dt.datetime, runtime: int | None
+) -> dt.datetime:
+    if not runtime:
+        return expires_at
+    return min(expires_at, started_at + dt.timedelta(minutes=runtime))
+
+
+@dataclass(frozen=True, slots=True)
+class TraktNowPlaying:
+    """What the user is watching, precomputed once per update."""
+
+    media_type: MediaType
+    content_id: str
+    title: str
+    started_at: dt.datetime
+    expires_at: dt.datetime
+    ends_at: dt.datetime
+    duration: int | None
+    image_url: str | None
+    series_title: str | None = None
+    season: str | None = None
+    episode: str | None = None
+    show_trakt_id: int | None = None
+    show_tmdb_id: int | None = None
+    season_number: int | None = None
+    episode_number: int | None = None
+    runtime: int | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the snapshot as a JSON serializable dict."""
+        data = asdict(self)
+        for key in ("started_at", "expires_at", "ends_at"):
+            data[key] = data[key].isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """Restore a snapshot saved with as_dict."""
+        names = {field.name for field in fields(cls)}
+        values = {key: value for key, value in data.items() if key in names}
+        values["media_type"] = MediaType(values["media_type"])
+        for key in ("started_at", "expires_at", "ends_at"):
+            values[key] = dt.datetime.fromisoformat(values[key])
+        return cls(**values)
+
+    @classmethod
+    def from_episode(
+        cls,
+        watching: TraktWatchingEpisode,
+        episode: TraktEpisode,
+        show: TraktShow,
+        image_url: str | None,
+    ) -> Self:
+        """Build the view of a playing episode."""
+        started_at = dt.datetime.fromisoformat(watching["started_at"])
+        expires_at = dt.datetime.fromisoformat(watching["expires_at"])
+        runtime = episode.get("runtime")
+        season_number = episode["season"]
+        episode_number = episode["number"]
+        return cls(
+            media_type=MediaType.EPISODE,
+            content_id=str(episode["ids"]["trakt"]),
+            title=episode_title(
+                show["title"], season_number, episode_number, episode["title"]
+            ),
+            started_at=started_at,
+            expires_at=expires_at,
+            ends_at=_ends_at(started_at, expires_at, runtime),
+            duration=runtime * 60 if runtime else None,
+            image_url=image_url,
+            series_title=show["title"],
+            season=f"Season {season_number}",
+            episode=episode["title"],
+            show_trakt_id=show["ids"]["trakt"],
+            show_tmdb_id=show["ids"].get("tmdb"),
+            season_number=season_number,
+            episode_number=episode_number,
+            runtime=runtime,
+        )
+
+    @classmethod
+    def from_movie(
+        cls,
+        watching: TraktWatchingMovie,
+        movie: TraktMovie,
+        image_url: str | None,
+    ) -> Self:
+        """Build the view of a playing movie."""
+        started_at = dt.datetime.fromisoformat(watching["started_at"])
+        expires_at = dt.datetime.fromisoformat(watching["expires_at"])
+        runtime = movie.get("runtime")
+        return cls(
+            media_type=MediaType.MOVIE,
+            content_id=str(movie["ids"]["trakt"]),
+            title=movie["title"],
+            started_at=started_at,
+            expires_at=expires_at,
+            ends_at=_ends_at(started_at, expires_at, runtime),
+            duration=runtime * 60 if runtime else None,
+            image_url=image_url,
+            runtime=runtime,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TraktHistorySummary:
+    """Play counts and the most recent item of the synced watch history."""
+
+    movie_plays: int = 0
+    episode_plays: int = 0
+    last_watched_title: str | None = None
+    last_watched_type: str | None = None
+    last_watched_at: dt.datetime | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class TraktUpNext:
+    """The next episode to watch of an in-progress show."""
+
+    show_trakt_id: int
+    show_title: str
+    episode_trakt_id: int
+    season: int
+    number: int
+    title: str | None
+    first_aired: dt.datetime | None
+    last_watched_at: dt.datetime
@@ -0,0 +1,49 @@
+"""Local "up next" computation from bulk watched state and season structures."""
+
+import datetime as dt
+from typing import Any
+
+
+def watched_marker(item: dict[str, Any]) -> str:
+    """Return a value that changes whenever a show's watched state does."""
+    return f"{item.get('last_watched_at')}|{item.get('last_updated_at')}"
+
+
+def find_next_episode(
+    seasons: list[dict[str, Any]],
+    watched_seasons: list[dict[str, Any]],
+    now: dt.datetime,
+) -> tuple[int, dict[str, Any]] | None:
+    """Return the season number and episode to watch next, if it has aired.
+
+    Like Trakt's own progress, this is the episode following the furthest
+    watched one, so skipped earlier episodes are not up next.
+    """
+    watched = {
+        (season["number"], episode["number"])
+        for season in watched_seasons
+        for episode in season.get("episodes", [])
+        if episode.get("plays")
+    }
+    episodes = [
+        (season["number"], episode)
+        for season in seasons
+        for episode in season["episodes"]
+    ]
+
+    last_index = max(
+        (
+            index
+            for index, (season, episode) in enumerate(episodes)
+            if (season, episode["number"]) in watched
+        ),
+        default=-1,
+    )
+    if last_index + 1 >= len(episodes):
+        return None
+
+    season, episode = episodes[last_index + 1]
+    first_aired = episode.get("first_aired")
+    if first_aired is None or dt.datetime.fromisoformat(first_aired) > now:
+        return None
+    return season, episode
@@ -0,0 +1,187 @@
+"""Rate limit scheduling for Trakt API requests."""
+
+import asyncio
+import datetime as dt
+import json
+import time
+from collections.abc import Mapping
+from enum import IntEnum
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DATA_RATE_LIMITERS,
+    LOGGER,
+    LOW_PRIORITY_MAX_DELAY,
+    LOW_PRIORITY_RESERVE,
+    RATELIMIT_LIMIT,
+    RATELIMIT_PERIOD,
+    RATELIMIT_POST_LIMIT,
+    RATELIMIT_POST_PERIOD,
+    TraktRatelimitInfo,
+)
+
+
+class RequestPriority(IntEnum):
+    """Scheduling priority of a Trakt request."""
+
+    LOW = 0
+    HIGH = 1
+
+
+class TraktRateLimitedError(Exception):
+    """Raised when a low priority request is dropped by the rate limiter."""
+
+
+class TokenBucket:
+    """Token bucket for one of Trakt's rate limits.
+
+    The bucket is refilled at limit/period and resynchronized from the
+    x-ratelimit and Retry-After response headers. Low priority requests may not
+    dip into a reserve kept for high priority ones, and are dropped rather than
+    delayed for too long.
+    """
+
+    def __init__(self, limit: int, period: int) -> None:
+        """Initialize the bucket."""
+        self.limit = limit
+        self.period = period
+        self._tokens = float(limit)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+
+    @property
+    def remaining(self) -> int:
+        """Return the estimated number of requests remaining."""
+        self._refill(time.monotonic())
+        return int(self._tokens)
+
+    def _refill(self, now: float) -> None:
+        rate = self.limit / self.period
+        self._tokens = min(
+            float(self.limit), self._tokens + (now - self._updated_at) * rate
+        )
+        self._updated_at = now
+
+    def _delay(self, priority: RequestPriority, now: float) -> float:
+        if self._blocked_until > now:
+            return self._blocked_until - now
+
+        # Whole requests only, so a bucket of one still lets low priority through
+        reserve = 0
+        if priority is RequestPriority.LOW:
+            reserve = int(self.limit * LOW_PRIORITY_RESERVE)
+        missing = reserve + 1 - self._tokens
+        if missing <= 0:
+            return 0.0
+        return missing * self.period / self.limit
+
+    async def async_acquire(self, priority: RequestPriority) -> None:
+        """Wait for a token, or raise if a low priority request must be dropped."""
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            delay = self._delay(priority, now)
+            if delay <= 0:
+                self._tokens -= 1
+                return
+
+            if priority is RequestPriority.LOW and delay > LOW_PRIORITY_MAX_DELAY:
+                raise TraktRateLimitedError(
+                    f"Trakt rate limited, dropping request for {delay:.0f}s"
+                )
+
+            LOGGER.debug("Delaying Trakt request %.1fs for rate limit", delay)
+            await asyncio.sleep(delay)
+
+    @callback
+    def async_update(
+        self, status: int, ratelimit: TraktRatelimitInfo | None, retry_after: str
+    ) -> None:
+        """Resynchronize the bucket from a response."""
+        now = time.monotonic()
+        self._refill(now)
+
+        if ratelimit is not None:
+            self.limit = ratelimit["limit"]
+            self.period = ratelimit["period"]
+            self._tokens = float(ratelimit["remaining"])
+
+            if ratelimit["remaining"] == 0:
+                LOGGER.error("Trakt no requests remaining for %s", ratelimit["name"])
+                until = dt.datetime.fromisoformat(ratelimit["until"])
+                wait = (until - dt.datetime.now(dt.UTC)).total_seconds()
+                self._blocked_until = max(self._blocked_until, now + wait)
+            elif ratelimit["remaining"] < 60 and self.limit > 60:
+                LOGGER.warning("Trakt ratelimit remaining: %s", ratelimit["remaining"])
+
+        if status == 429:
+            self._tokens = 0.0
+            if retry_after.isdigit():
+                self._blocked_until = max(self._blocked_until, now + int(retry_after))
+
+
+class TraktRateLimiter:
+    """Rate limits shared by every config entry using the same client_id.
+
+    Trakt limits GETs and writes separately, so each has its own bucket. A
+    response is accounted to the limit its x-ratelimit header names, falling
+    back to the one of its request method.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the rate limiter."""
+        self.buckets = {
+            "GET": TokenBucket(RATELIMIT_LIMIT, RATELIMIT_PERIOD),
+            "POST": TokenBucket(RATELIMIT_POST_LIMIT, RATELIMIT_POST_PERIOD),
+        }
+
+    @property
+    def limit(self) -> int:
+        """Return the GET limit per period."""
+        return self.buckets["GET"].limit
+
+    @property
+    def period(self) -> int:
+        """Return the GET limit period in seconds."""
+        return self.buckets["GET"].period
+
+    @property
+    def remaining(self) -> int:
+        """Return the estimated number of GET requests remaining."""
+        return self.buckets["GET"].remaining
+
+    def bucket(self, method: str) -> TokenBucket:
+        """Return the bucket requests of a method count against."""
+        return self.buckets["GET" if method == "GET" else "POST"]
+
+    async def async_acquire(
+        self, priority: RequestPriority, method: str = "GET"
+    ) -> None:
+        """Wait for a token, or raise if a low priority request must be dropped."""
+        await self.bucket(method).async_acquire(priority)
+
+    @callback
+    def async_update(
+        self, method: str, status: int, headers: Mapping[str, str]
+    ) -> None:
+        """Resynchronize the bucket of a request from its response headers."""
+        bucket = self.bucket(method)
+        ratelimit: TraktRatelimitInfo | None = None
+        if "x-ratelimit" in headers:
+            ratelimit = json.loads(headers["x-ratelimit"])
+            name = ratelimit.get("name", "")
+            if "POST" in name:
+                bucket = self.buckets["POST"]
+            elif "GET" in name:
+                bucket = self.buckets["GET"]
+        bucket.async_update(status, ratelimit, headers.get("Retry-After", ""))
+
+
+@callback
+def async_get_rate_limiter(hass: HomeAssistant, client_id: str) -> TraktRateLimiter:
+    """Return the rate limiter shared by all entries for a client_id."""
+    limiters: dict[str, TraktRateLimiter] = hass.data.setdefault(DATA_RATE_LIMITERS, {})
+    if client_id not in limiters:
+        limiters[client_id] = TraktRateLimiter()
+    return limiters[client_id]
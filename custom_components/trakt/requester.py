@@ -0,0 +1,382 @@
+"""Resilient HTTP request layer shared by Trakt and TMDB calls."""
+
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, TypedDict
+
+from aiohttp import (
+    ClientError,
+    ClientResponse,
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+    hdrs,
+)
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.ssl import get_default_context
+from yarl import URL
+
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    CONDITIONAL_CACHE_MAX_SIZE,
+    DATA_REQUESTER,
+    DATA_SESSION,
+    DEFAULT_HOST_TIMEOUT,
+    HOST_TIMEOUTS,
+    LOGGER,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF_BASE,
+    RETRY_MAX_DELAY,
+    SESSION_DNS_CACHE_TTL,
+    SESSION_KEEPALIVE_TIMEOUT,
+    SESSION_LIMIT_PER_HOST,
+)
+from .stats import RequestStats
+
+RequestSender = Callable[[ClientTimeout], Awaitable[ClientResponse]]
+ConditionalRequestSender = Callable[
+    [ClientTimeout, dict[str, str]], Awaitable[ClientResponse]
+]
+
+
+class RequestError(Exception):
+    """Raised when a request fails after all retries.
+
+    status is set when the server rejected the request with a 4xx response
+    that retrying would not change.
+    """
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        """Initialize the error."""
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(RequestError):
+    """Raised when a host's circuit is open and requests are not attempted."""
+
+
+class CircuitBreaker:
+    """Stop sending requests to a host after repeated failures.
+
+    After reset_timeout a single trial request is let through; its outcome
+    closes the circuit again or restarts the timer.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self.host = host
+        self.failures = 0
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while requests are being rejected."""
+        return self._opened_at is not None
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be attempted now."""
+        if self._opened_at is None:
+            return True
+        if time.monotonic() - self._opened_at >= self._reset_timeout:
+            self._opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit past the threshold."""
+        self.failures += 1
+        if self.failures >= self._failure_threshold:
+            if self._opened_at is None:
+                LOGGER.warning("Too many failures, pausing requests to %s", self.host)
+            self._opened_at = time.monotonic()
+
+
+class _ConditionalEntry(TypedDict):
+    etag: str | None
+    last_modified: str | None
+    data: Any
+
+
+class ConditionalCache:
+    """Bounded LRU of response validators and parsed bodies keyed by URL."""
+
+    def __init__(self, max_size: int = CONDITIONAL_CACHE_MAX_SIZE) -> None:
+        """Initialize the cache."""
+        self._entries: OrderedDict[str, _ConditionalEntry] = OrderedDict()
+        self._max_size = max_size
+
+    def lookup(self, url: str) -> _ConditionalEntry | None:
+        """Return the cached entry for a URL."""
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def store(self, url: str, response: ClientResponse, data: Any) -> None:
+        """Remember a parsed body if the response carries validators."""
+        etag = response.headers.get(hdrs.ETAG)
+        last_modified = response.headers.get(hdrs.LAST_MODIFIED)
+        if etag is None and last_modified is None:
+            self._entries.pop(url, None)
+            return
+
+        self._entries[url] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "data": data,
+        }
+        self._entries.move_to_end(url)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+def _conditional_headers(entry: _ConditionalEntry | None) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    if entry is None:
+        return headers
+    if entry["etag"] is not None:
+        headers[hdrs.IF_NONE_MATCH] = entry["etag"]
+    if entry["last_modified"] is not None:
+        headers[hdrs.IF_MODIFIED_SINCE] = entry["last_modified"]
+    return headers
+
+
+def _retry_after(response: ClientResponse) -> float | None:
+    value = response.headers.get("Retry-After", "")
+    if value.isdigit():
+        return float(value)
+    return None
+
+
+def backoff(attempt: int) -> float:
+    """Return a jittered exponential backoff delay for a retry attempt."""
+    return random.uniform(0, RETRY_BACKOFF_BASE * 2**attempt)
+
+
+class ResilientRequester:
+    """Send requests with per-host timeouts, retries and circuit breakers.
+
+    Identical shared GETs that are in flight at the same time are coalesced
+    into a single request whose parsed result every caller receives.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the requester."""
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+        self.coalesced = 0
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        """Return the circuit breaker for a host."""
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(host)
+        return self._breakers[host]
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the circuit breaker state of every host."""
+        return {
+            host: {"open": breaker.is_open, "failures": breaker.failures}
+            for host, breaker in self._breakers.items()
+        }
+
+    async def async_request(
+        self,
+        url: str,
+        send: RequestSender,
+        expect_json: bool = True,
+        stats: RequestStats | None = None,
+    ) -> ClientResponse:
+        """Send a request, retrying transient failures.
+
+        Connection errors, timeouts, 429 and 5xx responses are retried with
+        jittered exponential backoff, honoring Retry-After. Other 4xx
+        responses raise RequestError immediately, as do non-JSON success
+        bodies when expect_json is set.
+        """
+        start = time.monotonic()
+        try:
+            response = await self._async_request(url, send, expect_json)
+        except (RequestError, TimeoutError):
+            if stats is not None:
+                stats.record(url, time.monotonic() - start, None)
+            raise
+        if stats is not None:
+            stats.record(url, time.monotonic() - start, response.status)
+        return response
+
+    async def _async_request(
+        self,
+        url: str,
+        send: RequestSender,
+        expect_json: bool,
+    ) -> ClientResponse:
+        host = URL(url).host or ""
+        breaker = self.breaker(host)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+        timeout = ClientTimeout(total=HOST_TIMEOUTS.get(host, DEFAULT_HOST_TIMEOUT))
+        error: Exception | None = None
+        for attempt in range(RETRY_ATTEMPTS):
+            retry_after: float | None = None
+            rate_limited = False
+            try:
+                response = await send(timeout)
+            except (TimeoutError, ClientError) as err:
+                error = err
+            else:
+                if response.status == 429 or response.status >= 500:
+                    retry_after = _retry_after(response)
+                    rate_limited = response.status == 429
+                    response.release()
+                    error = RequestError(f"{host} returned {response.status}")
+                elif response.status >= 400:
+                    response.release()
+                    breaker.record_success()
+                    raise RequestError(
+                        f"{host} returned {response.status}", response.status
+                    )
+                elif (
+                    expect_json
+                    and response.status == 200
+                    and response.content_type != "application/json"
+                ):
+                    response.release()
+                    error = RequestError(
+                        f"{host} returned unexpected {response.content_type}"
+                    )
+                else:
+                    breaker.record_success()
+                    return response
+
+            if attempt + 1 == RETRY_ATTEMPTS:
+                break
+            delay = retry_after if retry_after is not None else backoff(attempt)
+            if delay > RETRY_MAX_DELAY:
+                break
+            LOGGER.debug("Retrying %s in %.1fs: %s", host, delay, error)
+            await asyncio.sleep(delay)
+
+        if not rate_limited:
+            breaker.record_failure()
+        raise RequestError(f"Request to {host} failed: {error}") from error
+
+    async def async_get_json(
+        self,
+        url: str,
+        send: ConditionalRequestSender,
+        cache: ConditionalCache | None = None,
+        stats: RequestStats | None = None,
+        shared: bool = False,
+    ) -> Any:
+        """Send a GET and return its parsed JSON body, or None if it had none.
+
+        With a cache, the request is made conditional on the stored validators
+        and a 304 returns the previously parsed object without decoding.
+
+        Shared requests must not depend on who sends them. A shared GET for a
+        URL already in flight waits for that request instead of sending its
+        own, and the returned object must not be mutated.
+        """
+        if not shared:
+            return await self._async_get_json(url, send, cache, stats)
+
+        if (task := self._inflight.get(url)) is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.get_running_loop().create_task(
+                self._async_get_json(url, send, cache, stats)
+            )
+            self._inflight[url] = task
+            task.add_done_callback(lambda task: self._async_finish(url, task))
+        return await asyncio.shield(task)
+
+    @callback
+    def _async_finish(self, url: str, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(url) is task:
+            del self._inflight[url]
+        # Every waiter may have been cancelled, so retrieve the exception here
+        if not task.cancelled():
+            task.exception()
+
+    async def _async_get_json(
+        self,
+        url: str,
+        send: ConditionalRequestSender,
+        cache: ConditionalCache | None,
+        stats: RequestStats | None,
+    ) -> Any:
+        entry = cache.lookup(url) if cache is not None else None
+        headers = _conditional_headers(entry)
+
+        async def send_conditional(timeout: ClientTimeout) -> ClientResponse:
+            return await send(timeout, headers)
+
+        response = await self.async_request(url, send_conditional, stats=stats)
+        if response.status == 304 and entry is not None:
+            response.release()
+            return entry["data"]
+        if response.content_type != "application/json":
+            response.release()
+            return None
+
+        data = await response.json()
+        if cache is not None:
+            cache.store(url, response, data)
+        return data
+
+
+@callback
+def async_get_requester(hass: HomeAssistant) -> ResilientRequester:
+    """Return the requester shared by all config entries."""
+    if DATA_REQUESTER not in hass.data:
+        hass.data[DATA_REQUESTER] = ResilientRequester()
+    requester: ResilientRequester = hass.data[DATA_REQUESTER]
+    return requester
+
+
+@callback
+def async_get_session(hass: HomeAssistant) -> ClientSession:
+    """Return the connection pool shared by Trakt and TMDB requests.
+
+    Connections are kept alive between polls and DNS lookups are cached, so
+    steady state requests skip the resolver and TLS handshakes.
+    """
+    if DATA_SESSION not in hass.data:
+        connector = TCPConnector(
+            ssl=get_default_context(),
+            limit_per_host=SESSION_LIMIT_PER_HOST,
+            keepalive_timeout=SESSION_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=SESSION_DNS_CACHE_TTL,
+        )
+        session = ClientSession(
+            connector=connector,
+            headers={hdrs.USER_AGENT: SERVER_SOFTWARE},
+        )
+
+        async def _async_close(event: Event) -> None:
+            await session.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close)
+        hass.data[DATA_SESSION] = session
+    websession: ClientSession = hass.data[DATA_SESSION]
+    return websession
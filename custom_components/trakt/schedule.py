@@ -0,0 +1,43 @@
+"""Poll scheduling for the Trakt watching coordinator."""
+
+import datetime as dt
+
+from .const import (
+    POLL_END_WINDOW,
+    POLL_IDLE_INTERVAL,
+    POLL_IDLE_MAX_INTERVAL,
+    POLL_MAX_PLAYING_INTERVAL,
+    POLL_MIN_INTERVAL,
+    POLL_OVERRUN_INTERVAL,
+    POLL_PUSH_IDLE_INTERVAL,
+)
+from .models import TraktNowPlaying
+
+
+def next_poll_interval(
+    now_playing: TraktNowPlaying | None,
+    idle_polls: int,
+    now: dt.datetime,
+    push_updates: bool = False,
+) -> dt.timedelta:
+    """Return how long to wait before polling /users/me/watching again.
+
+    While playing, polls are sparse mid-title and tighten as the predicted end
+    approaches so the switch to idle is noticed quickly. While idle, the
+    interval doubles with each consecutive idle poll up to a cap, or is a long
+    fixed fallback when players push playback events instead.
+    """
+    if now_playing is None and push_updates:
+        return POLL_PUSH_IDLE_INTERVAL
+    if now_playing is None:
+        backoff = 1 << min(max(idle_polls - 1, 0), 10)
+        return min(POLL_IDLE_INTERVAL * backoff, POLL_IDLE_MAX_INTERVAL)
+
+    remaining = now_playing.ends_at - now
+    if remaining <= dt.timedelta(0):
+        return POLL_OVERRUN_INTERVAL
+    if remaining <= POLL_END_WINDOW:
+        return POLL_MIN_INTERVAL
+
+    interval = min(remaining / 2, remaining - POLL_END_WINDOW)
+    return max(POLL_MIN_INTERVAL, min(interval, POLL_MAX_PLAYING_INTERVAL))
@@ -0,0 +1,303 @@
+"""Scrobble what other media players are playing to Trakt."""
+
+import asyncio
+import datetime as dt
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Literal
+from urllib.parse import quote, urlencode
+
+from homeassistant.components.media_player.const import (
+    ATTR_MEDIA_CONTENT_ID,
+    ATTR_MEDIA_CONTENT_TYPE,
+    ATTR_MEDIA_DURATION,
+    ATTR_MEDIA_EPISODE,
+    ATTR_MEDIA_POSITION,
+    ATTR_MEDIA_POSITION_UPDATED_AT,
+    ATTR_MEDIA_SEASON,
+    ATTR_MEDIA_SERIES_TITLE,
+    ATTR_MEDIA_TITLE,
+    MediaPlayerState,
+    MediaType,
+)
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from .api import AsyncConfigEntryAuth
+from .const import (
+    LOGGER,
+    SCROBBLE_MISS_MAX_SIZE,
+    SCROBBLE_MISS_TTL,
+    TraktQueuedWrite,
+)
+from .idmap import MediaKind, TraktIdIndex
+from .ratelimit import TraktRateLimitedError
+from .requester import RequestError
+from .writequeue import TraktWriteQueue
+
+ScrobbleAction = Literal["start", "pause", "stop"]
+
+EXTERNAL_ID_PATTERNS = {
+    "imdb": re.compile(r"\b(tt\d{5,})\b"),
+    "tmdb": re.compile(r"\btmdb[:/]+(\d+)"),
+    "tvdb": re.compile(r"\btvdb[:/]+(\d+)"),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class _Playing:
+    """What a media player is playing, as far as its state tells."""
+
+    media_type: Literal["movie", "episode"]
+    title: str | None
+    series_title: str | None
+    season: int | None
+    episode: int | None
+    ids: tuple[tuple[str, str], ...]
+
+    @classmethod
+    def from_state(cls, state: State | None) -> "_Playing | None":
+        if state is None or state.state not in (
+            MediaPlayerState.PLAYING,
+            MediaPlayerState.PAUSED,
+        ):
+            return None
+        attributes = state.attributes
+        content_type = attributes.get(ATTR_MEDIA_CONTENT_TYPE)
+        content_id = str(attributes.get(ATTR_MEDIA_CONTENT_ID) or "")
+        ids = tuple(
+            (id_type, match.group(1))
+            for id_type, pattern in EXTERNAL_ID_PATTERNS.items()
+            if (match := pattern.search(content_id))
+        )
+        if content_type == MediaType.MOVIE:
+            media_type: Literal["movie", "episode"] = "movie"
+        elif content_type in (MediaType.EPISODE, MediaType.TVSHOW):
+            media_type = "episode"
+        else:
+            return None
+        return cls(
+            media_type=media_type,
+            title=attributes.get(ATTR_MEDIA_TITLE),
+            series_title=attributes.get(ATTR_MEDIA_SERIES_TITLE),
+            season=_int(attributes.get(ATTR_MEDIA_SEASON)),
+            episode=_int(attributes.get(ATTR_MEDIA_EPISODE)),
+            ids=ids,
+        )
+
+
+def _int(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _progress(state: State, now: dt.datetime) -> float:
+    """Return the playback progress of a state in percent, extrapolated to now."""
+    attributes = state.attributes
+    duration = attributes.get(ATTR_MEDIA_DURATION)
+    position = attributes.get(ATTR_MEDIA_POSITION)
+    if not duration or position is None:
+        return 0
+    updated_at = attributes.get(ATTR_MEDIA_POSITION_UPDATED_AT)
+    if state.state == MediaPlayerState.PLAYING and isinstance(updated_at, dt.datetime):
+        position += (now - updated_at).total_seconds()
+    progress: float = round(min(max(position / duration * 100, 0), 100), 2)
+    return progress
+
+
+class TraktAutoScrobbler:
+    """Follow media player entities and scrobble their playback to Trakt.
+
+    Items are resolved to Trakt ids through the local id index first. Only
+    misses search Trakt, and a miss is remembered for a while so a title that
+    cannot be found is not searched on every state change. Scrobbles go through
+    the write queue, so they survive outages like manual ones.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_auth: AsyncConfigEntryAuth,
+        id_index: TraktIdIndex,
+        queue: TraktWriteQueue,
+        entity_ids: list[str],
+    ) -> None:
+        """Initialize the scrobbler."""
+        self._hass = hass
+        self._entry_auth = entry_auth
+        self._id_index = id_index
+        self._queue = queue
+        self._entity_ids = entity_ids
+        self._lock = asyncio.Lock()
+        # entity id -> (what is playing, its Trakt ids, last action sent)
+        self._sessions: dict[str, tuple[_Playing, dict[str, int], ScrobbleAction]] = {}
+        # Trakt paths that found nothing -> when, oldest first
+        self._misses: OrderedDict[str, dt.datetime] = OrderedDict()
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start following the media players."""
+        return async_track_state_change_event(
+            self._hass, self._entity_ids, self._async_state_changed
+        )
+
+    @callback
+    def _async_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        self._hass.async_create_background_task(
+            self._async_handle(
+                event.data["entity_id"],
+                event.data["old_state"],
+                event.data["new_state"],
+            ),
+            name="trakt auto scrobble",
+        )
+
+    async def _async_handle(
+        self, entity_id: str, old_state: State | None, new_state: State | None
+    ) -> None:
+        # One at a time, so the actions of a player are queued in order
+        async with self._lock:
+            now = dt_util.utcnow()
+            playing = _Playing.from_state(new_state)
+            session = self._sessions.get(entity_id)
+
+            if session is not None and session[0] != playing:
+                del self._sessions[entity_id]
+                if old_state is not None:
+                    self._async_scrobble(
+                        session[0], session[1], "stop", _progress(old_state, now)
+                    )
+                session = None
+
+            if playing is None or new_state is None:
+                return
+            action: ScrobbleAction = (
+                "start" if new_state.state == MediaPlayerState.PLAYING else "pause"
+            )
+            if session is not None and session[2] == action:
+                return
+            if session is None and action == "pause":
+                return
+
+            if session is not None:
+                ids = session[1]
+            elif (resolved := await self._async_resolve(playing)) is not None:
+                ids = resolved
+            else:
+                LOGGER.debug(
+                    "Not scrobbling %s, no Trakt match: %s", entity_id, playing
+                )
+                return
+            self._sessions[entity_id] = (playing, ids, action)
+            self._async_scrobble(playing, ids, action, _progress(new_state, now))
+
+    @callback
+    def _async_scrobble(
+        self,
+        playing: _Playing,
+        ids: dict[str, int],
+        action: ScrobbleAction,
+        progress: float,
+    ) -> None:
+        item: TraktQueuedWrite = {
+            "kind": "scrobble",
+            "media_type": playing.media_type,
+            "ids": dict(ids),
+            "queued_at": dt_util.utcnow().isoformat(),
+            "action": action,
+            "progress": progress,
+        }
+        self._queue.async_enqueue(item)
+
+    async def _async_resolve(self, playing: _Playing) -> dict[str, int] | None:
+        ids = dict(playing.ids)
+        try:
+            if playing.media_type == "movie":
+                trakt_id = await self._async_resolve_title("movie", ids, playing.title)
+            elif (trakt_id := self._id_index.lookup_ids("episode", ids)) is None:
+                trakt_id = await self._async_resolve_episode(playing)
+        except (TraktRateLimitedError, RequestError) as err:
+            LOGGER.debug("Failed to resolve %s on Trakt: %s", playing, err)
+            return None
+        return None if trakt_id is None else {"trakt": trakt_id}
+
+    async def _async_resolve_title(
+        self, kind: MediaKind, ids: dict[str, Any], title: str | None
+    ) -> int | None:
+        if (trakt_id := self._id_index.lookup_ids(kind, ids)) is not None:
+            return trakt_id
+        if title and (trakt_id := self._id_index.lookup_title(kind, title)):
+            return trakt_id
+
+        for id_type, value in ids.items():
+            path = f"/search/{id_type}/{quote(value)}?type={kind}"
+            if (trakt_id := await self._async_search(kind, path)) is not None:
+                return trakt_id
+        if title:
+            query = urlencode({"query": title, "fields": "title", "limit": 1})
+            return await self._async_search(kind, f"/search/{kind}?{query}")
+        return None
+
+    async def _async_resolve_episode(self, playing: _Playing) -> int | None:
+        if playing.season is None or playing.episode is None:
+            return None
+        show_id = await self._async_resolve_title("show", {}, playing.series_title)
+        if show_id is None:
+            return None
+        if (
+            trakt_id := self._id_index.lookup_episode(
+                show_id, playing.season, playing.episode
+            )
+        ) is not None:
+            return trakt_id
+
+        path = f"/shows/{show_id}/seasons/{playing.season}"
+        if self._missed(path):
+            return None
+        episodes = await self._entry_auth.async_get_json(path, shared=True)
+        self._id_index.add_episodes(show_id, episodes or [])
+        if (
+            trakt_id := self._id_index.lookup_episode(
+                show_id, playing.season, playing.episode
+            )
+        ) is None:
+            self._add_miss(path)
+        return trakt_id
+
+    async def _async_search(self, kind: MediaKind, path: str) -> int | None:
+        """Search Trakt, indexing every result and returning the first."""
+        if self._missed(path):
+            return None
+        results = await self._entry_auth.async_get_json(path, revalidate=False) or []
+        self._id_index.add_payload(results)
+        for result in results:
+            if isinstance(
+                trakt_id := result.get(kind, {}).get("ids", {}).get("trakt"), int
+            ):
+                return trakt_id
+        self._add_miss(path)
+        return None
+
+    def _missed(self, path: str) -> bool:
+        """Return whether a request recently found nothing, dropping stale misses."""
+        expired = dt_util.utcnow() - SCROBBLE_MISS_TTL
+        while self._misses and next(iter(self._misses.values())) < expired:
+            self._misses.popitem(last=False)
+        return path in self._misses
+
+    def _add_miss(self, path: str) -> None:
+        self._misses[path] = dt_util.utcnow()
+        self._misses.move_to_end(path)
+        while len(self._misses) > SCROBBLE_MISS_MAX_SIZE:
+            self._misses.popitem(last=False)
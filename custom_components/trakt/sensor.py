@@ -0,0 +1,429 @@
+"""Trakt sensors."""
+
+import datetime as dt
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import (
+    TraktAccountUpdateCoordinator,
+    TraktData,
+    TraktHistoryUpdateCoordinator,
+    TraktUpNextUpdateCoordinator,
+)
+from .models import TraktHistorySummary
+
+SCAN_INTERVAL = dt.timedelta(minutes=1)
+
+
+def _mean_latency(data: TraktData) -> float | None:
+    endpoints = data.watching.entry_auth.stats.endpoints.values()
+    requests = sum(stats.requests for stats in endpoints)
+    if not requests:
+        return None
+    return round(sum(stats.total_time for stats in endpoints) / requests * 1000, 1)
+
+
+def _cache_hit_rate(data: TraktData) -> float | None:
+    if (hit_rate := data.watching.metadata_cache.hit_rate) is None:
+        return None
+    return round(hit_rate * 100, 1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class TraktSensorEntityDescription(SensorEntityDescription):
+    """Describes a Trakt diagnostic sensor."""
+
+    value_fn: Callable[[TraktData], StateType | dt.datetime]
+    attributes_fn: Callable[[TraktData], dict[str, Any]] | None = None
+
+
+# Request statistics change on nearly every poll, so they are disabled by
+# default to keep them out of the recorder unless someone wants them
+SENSORS: tuple[TraktSensorEntityDescription, ...] = (
+    TraktSensorEntityDescription(
+        key="api_requests",
+        name="API requests",
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data.watching.entry_auth.stats.total_requests,
+        attributes_fn=lambda data: {
+            name: stats.requests
+            for name, stats in data.watching.entry_auth.stats.endpoints.items()
+        },
+    ),
+    TraktSensorEntityDescription(
+        key="api_latency",
+        name="API latency",
+        entity_registry_enabled_default=False,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_mean_latency,
+    ),
+    TraktSensorEntityDescription(
+        key="metadata_cache_hit_rate",
+        name="Metadata cache hit rate",
+        entity_registry_enabled_default=False,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_cache_hit_rate,
+    ),
+    TraktSensorEntityDescription(
+        key="ratelimit_remaining",
+        name="Rate limit remaining",
+        entity_registry_enabled_default=False,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.watching.entry_auth.rate_limiter.remaining,
+    ),
+    TraktSensorEntityDescription(
+        key="last_successful_update",
+        name="Last successful update",
+        entity_registry_enabled_default=False,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda data: data.watching.last_success_time,
+    ),
+    TraktSensorEntityDescription(
+        key="queued_writes",
+        name="Queued writes",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: len(data.queue),
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class TraktHistorySensorEntityDescription(SensorEntityDescription):
+    """Describes a Trakt watch history sensor."""
+
+    value_fn: Callable[[TraktHistorySummary], StateType | dt.datetime]
+    attributes_fn: Callable[[TraktHistorySummary], dict[str, Any]] | None = None
+
+
+HISTORY_SENSORS: tuple[TraktHistorySensorEntityDescription, ...] = (
+    TraktHistorySensorEntityDescription(
+        key="last_watched",
+        name="Last watched",
+        value_fn=lambda summary: summary.last_watched_title,
+        attributes_fn=lambda summary: {
+            "media_type": summary.last_watched_type,
+            "watched_at": summary.last_watched_at,
+        },
+    ),
+    TraktHistorySensorEntityDescription(
+        key="movie_plays",
+        name="Movie plays",
+        state_class=SensorStateClass.TOTAL,
+        value_fn=lambda summary: summary.movie_plays,
+    ),
+    TraktHistorySensorEntityDescription(
+        key="episode_plays",
+        name="Episode plays",
+        state_class=SensorStateClass.TOTAL,
+        value_fn=lambda summary: summary.episode_plays,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class TraktAccountSensorEntityDescription(SensorEntityDescription):
+    """Describes a Trakt account sensor fed by one tier of account data."""
+
+    tier: str
+    value_fn: Callable[[Any], StateType | dt.datetime]
+    attributes_fn: Callable[[Any], dict[str, Any]] | None = None
+
+
+def _joined_at(profile: dict[str, Any]) -> dt.datetime | None:
+    if joined_at := profile.get("joined_at"):
+        return dt.datetime.fromisoformat(joined_at)
+    return None
+
+
+ACCOUNT_SENSORS: tuple[TraktAccountSensorEntityDescription, ...] = (
+    TraktAccountSensorEntityDescription(
+        key="member_since",
+        name="Member since",
+        tier="profile",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=_joined_at,
+        attributes_fn=lambda profile: {
+            "name": profile.get("name"),
+            "vip": profile.get("vip"),
+            "private": profile.get("private"),
+        },
+    ),
+    TraktAccountSensorEntityDescription(
+        key="movies_watched",
+        name="Movies watched",
+        tier="stats",
+        state_class=SensorStateClass.TOTAL,
+        value_fn=lambda stats: stats["movies"]["watched"],
+    ),
+    TraktAccountSensorEntityDescription(
+        key="shows_watched",
+        name="Shows watched",
+        tier="stats",
+        state_class=SensorStateClass.TOTAL,
+        value_fn=lambda stats: stats["shows"]["watched"],
+    ),
+    TraktAccountSensorEntityDescription(
+        key="episodes_watched",
+        name="Episodes watched",
+        tier="stats",
+        state_class=SensorStateClass.TOTAL,
+        value_fn=lambda stats: stats["episodes"]["watched"],
+    ),
+    TraktAccountSensorEntityDescription(
+        key="watch_time",
+        name="Watch time",
+        tier="stats",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        state_class=SensorStateClass.TOTAL,
+        value_fn=lambda stats: (
+            stats["movies"]["minutes"] + stats["episodes"]["minutes"]
+        ),
+    ),
+    TraktAccountSensorEntityDescription(
+        key="ratings",
+        name="Ratings",
+        tier="stats",
+        state_class=SensorStateClass.TOTAL,
+        value_fn=lambda stats: stats["ratings"]["total"],
+        attributes_fn=lambda stats: {"distribution": stats["ratings"]["distribution"]},
+    ),
+    TraktAccountSensorEntityDescription(
+        key="watchlist_movies",
+        name="Watchlist movies",
+        tier="watchlist",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda watchlist: watchlist["movies"],
+    ),
+    TraktAccountSensorEntityDescription(
+        key="watchlist_shows",
+        name="Watchlist shows",
+        tier="watchlist",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda watchlist: watchlist["shows"],
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Trakt sensors from a config entry."""
+    data: TraktData = hass.data[DOMAIN][entry.entry_id]
+    username = entry.data["username"]
+
+    async_add_entities(
+        [
+            *(
+                TraktDiagnosticSensor(data, username, description)
+                for description in SENSORS
+            ),
+            *(
+                TraktHistorySensor(data.history, username, description)
+                for description in HISTORY_SENSORS
+            ),
+            TraktUpNextSensor(data.up_next, username),
+            *(
+                TraktAccountSensor(data.account, username, description)
+                for description in ACCOUNT_SENSORS
+            ),
+        ]
+    )
+
+
+def _device_info(username: str) -> DeviceInfo:
+    return DeviceInfo(
+        identifiers={(DOMAIN, username)},
+        manufacturer="Trakt",
+        model="Trakt API",
+        name="Trakt",
+    )
+
+
+class TraktDiagnosticSensor(SensorEntity):
+    """Sensor reporting the integration's own request and cache behavior.
+
+    Polled on its own interval rather than following the coordinator, which
+    only notifies listeners when the watched item changes.
+    """
+
+    entity_description: TraktSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        data: TraktData,
+        username: str,
+        description: TraktSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.data = data
+        self.entity_description = description
+        self._attr_unique_id = f"{username}_{description.key}"
+        self._attr_device_info = _device_info(username)
+
+    @property
+    def native_value(self) -> StateType | dt.datetime:
+        """Return the sensor value."""
+        return self.entity_description.value_fn(self.data)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return per-endpoint details."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.data)
+
+
+class TraktHistorySensor(
+    CoordinatorEntity[TraktHistoryUpdateCoordinator],
+    SensorEntity,
+):
+    """Sensor reporting from the locally synced watch history."""
+
+    entity_description: TraktHistorySensorEntityDescription
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: TraktHistoryUpdateCoordinator,
+        username: str,
+        description: TraktHistorySensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{username}_{description.key}"
+        self._attr_device_info = _device_info(username)
+
+    @property
+    def available(self) -> bool:
+        """The synced history stays usable while Trakt is unreachable."""
+        return self.coordinator.data is not None
+
+    @property
+    def native_value(self) -> StateType | dt.datetime:
+        """Return the sensor value."""
+        return self.entity_description.value_fn(self.coordinator.data)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return details of the value."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.coordinator.data)
+
+
+class TraktUpNextSensor(
+    CoordinatorEntity[TraktUpNextUpdateCoordinator],
+    SensorEntity,
+):
+    """Number of in-progress shows, with the next episode of each."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Up next"
+    _attr_native_unit_of_measurement = "shows"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _unrecorded_attributes = frozenset({"shows"})
+
+    def __init__(
+        self,
+        coordinator: TraktUpNextUpdateCoordinator,
+        username: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{username}_up_next"
+        self._attr_device_info = _device_info(username)
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the number of shows with an episode up next."""
+        if self.coordinator.data is None:
+            return None
+        return len(self.coordinator.data)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the next episode of every in-progress show."""
+        return {
+            "shows": [
+                {
+                    "show": up_next.show_title,
+                    "show_trakt_id": up_next.show_trakt_id,
+                    "episode_trakt_id": up_next.episode_trakt_id,
+                    "season": up_next.season,
+                    "number": up_next.number,
+                    "title": up_next.title,
+                    "first_aired": up_next.first_aired,
+                    "last_watched_at": up_next.last_watched_at,
+                }
+                for up_next in self.coordinator.data or []
+            ]
+        }
+
+
+class TraktAccountSensor(
+    CoordinatorEntity[TraktAccountUpdateCoordinator],
+    SensorEntity,
+):
+    """Sensor reporting slowly changing account data."""
+
+    entity_description: TraktAccountSensorEntityDescription
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: TraktAccountUpdateCoordinator,
+        username: str,
+        description: TraktAccountSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{username}_{description.key}"
+        self._attr_device_info = _device_info(username)
+
+    @property
+    def available(self) -> bool:
+        """Cached account data stays usable while Trakt is unreachable."""
+        return self.entity_description.tier in (self.coordinator.data or {})
+
+    @property
+    def native_value(self) -> StateType | dt.datetime:
+        """Return the sensor value."""
+        return self.entity_description.value_fn(
+            self.coordinator.data[self.entity_description.tier]
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return details of the value."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(
+            self.coordinator.data[self.entity_description.tier]
+        )
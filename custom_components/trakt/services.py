@@ -0,0 +1,128 @@
+"""Services for writing to Trakt and refreshing on demand."""
+
+import asyncio
+from typing import Any, cast
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, TraktQueuedWrite
+from .coordinator import TraktData
+
+SERVICE_MARK_WATCHED = "mark_watched"
+SERVICE_CHECKIN = "checkin"
+SERVICE_SCROBBLE = "scrobble"
+SERVICE_REFRESH = "refresh"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_MEDIA_TYPE = "media_type"
+ATTR_IDS = "ids"
+ATTR_WATCHED_AT = "watched_at"
+ATTR_MESSAGE = "message"
+ATTR_ACTION = "action"
+ATTR_PROGRESS = "progress"
+
+_ITEM_SCHEMA = {
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Required(ATTR_MEDIA_TYPE): vol.In(["movie", "episode"]),
+    vol.Required(ATTR_IDS): vol.Schema(
+        {vol.In(["trakt", "slug", "imdb", "tmdb", "tvdb"]): vol.Any(int, str)}
+    ),
+}
+
+MARK_WATCHED_SCHEMA = vol.Schema(
+    {**_ITEM_SCHEMA, vol.Optional(ATTR_WATCHED_AT): cv.datetime}
+)
+CHECKIN_SCHEMA = vol.Schema({**_ITEM_SCHEMA, vol.Optional(ATTR_MESSAGE): cv.string})
+REFRESH_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string})
+SCROBBLE_SCHEMA = vol.Schema(
+    {
+        **_ITEM_SCHEMA,
+        vol.Required(ATTR_ACTION): vol.In(["start", "pause", "stop"]),
+        vol.Required(ATTR_PROGRESS): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=100)
+        ),
+    }
+)
+
+
+def _loaded_entry_data(hass: HomeAssistant, call: ServiceCall) -> list[TraktData]:
+    """Return the data of the entry a call targets, or of every loaded entry."""
+    if entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID):
+        entry = hass.config_entries.async_get_entry(entry_id)
+        entries = [entry] if entry is not None and entry.domain == DOMAIN else []
+    else:
+        entries = hass.config_entries.async_entries(DOMAIN)
+    return [
+        hass.data[DOMAIN][entry.entry_id]
+        for entry in entries
+        if entry.state is ConfigEntryState.LOADED
+    ]
+
+
+def _entry_data(hass: HomeAssistant, call: ServiceCall) -> TraktData:
+    """Return the data of the entry a call targets, or of the only entry."""
+    if len(entries := _loaded_entry_data(hass, call)) != 1:
+        raise ServiceValidationError(
+            "Specify the config_entry_id of a loaded Trakt account"
+        )
+    return entries[0]
+
+
+def _queued_write(call: ServiceCall, **fields: Any) -> TraktQueuedWrite:
+    item: dict[str, Any] = {
+        "media_type": call.data[ATTR_MEDIA_TYPE],
+        "ids": dict(call.data[ATTR_IDS]),
+        "queued_at": dt_util.utcnow().isoformat(),
+        **fields,
+    }
+    return cast(TraktQueuedWrite, item)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services that queue writes to Trakt or refresh it."""
+
+    async def async_mark_watched(call: ServiceCall) -> None:
+        watched_at = dt_util.as_utc(call.data.get(ATTR_WATCHED_AT) or dt_util.utcnow())
+        _entry_data(hass, call).queue.async_enqueue(
+            _queued_write(call, kind="history", watched_at=watched_at.isoformat())
+        )
+
+    async def async_checkin(call: ServiceCall) -> None:
+        fields: dict[str, Any] = {"kind": "checkin"}
+        if ATTR_MESSAGE in call.data:
+            fields["message"] = call.data[ATTR_MESSAGE]
+        _entry_data(hass, call).queue.async_enqueue(_queued_write(call, **fields))
+
+    async def async_scrobble(call: ServiceCall) -> None:
+        _entry_data(hass, call).queue.async_enqueue(
+            _queued_write(
+                call,
+                kind="scrobble",
+                action=call.data[ATTR_ACTION],
+                progress=call.data[ATTR_PROGRESS],
+            )
+        )
+
+    async def async_refresh(call: ServiceCall) -> None:
+        if not (entries := _loaded_entry_data(hass, call)):
+            raise ServiceValidationError("No loaded Trakt account to refresh")
+        await asyncio.gather(*(data.watching.async_push_refresh() for data in entries))
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_MARK_WATCHED, async_mark_watched, schema=MARK_WATCHED_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_CHECKIN, async_checkin, schema=CHECKIN_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SCROBBLE, async_scrobble, schema=SCROBBLE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH, async_refresh, schema=REFRESH_SCHEMA
+    )
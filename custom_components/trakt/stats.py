@@ -0,0 +1,82 @@
+"""Request statistics for the Trakt integration."""
+
+import re
+from typing import Any
+
+from yarl import URL
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_name(url: str) -> str:
+    """Return a URL's host and path with numeric ids collapsed."""
+    parsed = URL(url)
+    return f"{parsed.host}{_ID_SEGMENT.sub('/{id}', parsed.path)}"
+
+
+class EndpointStats:
+    """Request count, outcome and latency histogram of one endpoint."""
+
+    __slots__ = ("buckets", "errors", "not_modified", "requests", "total_time")
+
+    def __init__(self) -> None:
+        """Initialize the stats."""
+        self.requests = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.total_time = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, duration: float, status: int | None) -> None:
+        """Record one request, with a None status for failures."""
+        self.requests += 1
+        self.total_time += duration
+        if status is None:
+            self.errors += 1
+        elif status == 304:
+            self.not_modified += 1
+
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats as a JSON serializable dict."""
+        labels = [f"<={int(bound * 1000)}ms" for bound in LATENCY_BUCKETS]
+        labels.append(f">{int(LATENCY_BUCKETS[-1] * 1000)}ms")
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "not_modified": self.not_modified,
+            "mean_ms": round(self.total_time / self.requests * 1000, 1),
+            "latency": dict(zip(labels, self.buckets, strict=True)),
+        }
+
+
+class RequestStats:
+    """Per-endpoint request statistics for a config entry."""
+
+    def __init__(self) -> None:
+        """Initialize the stats."""
+        self.endpoints: dict[str, EndpointStats] = {}
+
+    def record(self, url: str, duration: float, status: int | None) -> None:
+        """Record one request to a URL."""
+        name = endpoint_name(url)
+        if name not in self.endpoints:
+            self.endpoints[name] = EndpointStats()
+        self.endpoints[name].record(duration, status)
+
+    @property
+    def total_requests(self) -> int:
+        """Return the number of requests across all endpoints."""
+        return sum(stats.requests for stats in self.endpoints.values())
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the stats of every endpoint."""
+        return {name: stats.as_dict() for name, stats in self.endpoints.items()}
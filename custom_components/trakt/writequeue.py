@@ -0,0 +1,216 @@
+"""Durable, batched queue of writes to Trakt."""
+
+import asyncio
+import datetime as dt
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import AsyncConfigEntryAuth
+from .const import (
+    DOMAIN,
+    LOGGER,
+    SCROBBLE_WATCHED_PROGRESS,
+    WRITE_BATCH_SIZE,
+    WRITE_FLUSH_DELAY,
+    WRITE_FLUSH_INTERVAL,
+    WRITE_LIVE_MAX_AGE,
+    WRITE_QUEUE_SAVE_DELAY,
+    WRITE_QUEUE_STORAGE_VERSION,
+    WRITE_RETRY_STATUSES,
+    Clock,
+    TraktQueuedWrite,
+)
+from .ratelimit import RequestPriority, TraktRateLimitedError
+from .requester import RequestError
+
+
+def write_queue_store(
+    hass: HomeAssistant, entry_id: str
+) -> Store[list[TraktQueuedWrite]]:
+    """Return the store holding a config entry's pending writes."""
+    return Store(hass, WRITE_QUEUE_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.queue")
+
+
+def _expire(item: TraktQueuedWrite, now: dt.datetime) -> TraktQueuedWrite | None:
+    """Turn a check-in or scrobble that is too old to send live into history.
+
+    A late check-in or finished scrobble still records the play at the time
+    it was queued; a late start or pause means nothing and is dropped.
+    """
+    if item["kind"] == "history":
+        return item
+    queued_at = dt.datetime.fromisoformat(item["queued_at"])
+    if now - queued_at < WRITE_LIVE_MAX_AGE:
+        return item
+    if item["kind"] == "checkin" or (
+        item.get("action") == "stop"
+        and item.get("progress", 0) >= SCROBBLE_WATCHED_PROGRESS
+    ):
+        return {
+            "kind": "history",
+            "media_type": item["media_type"],
+            "ids": item["ids"],
+            "queued_at": item["queued_at"],
+            "watched_at": item["queued_at"],
+        }
+    return None
+
+
+class TraktWriteQueue:
+    """Persisted queue of history, check-in and scrobble writes.
+
+    Items are saved before a flush is attempted and only removed once Trakt
+    accepted or permanently rejected them, so they survive restarts and
+    outages, including expired tokens and locked accounts. History items are
+    sent in batches of up to WRITE_BATCH_SIZE in a single /sync/history
+    request; check-ins and scrobbles go one by one, in order. Flushes use low
+    priority requests, so they back off instead of competing with polls when
+    the shared rate limit runs low.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        entry_auth: AsyncConfigEntryAuth,
+        clock: Clock = dt_util.utcnow,
+    ) -> None:
+        """Initialize the queue."""
+        self._hass = hass
+        self._entry_auth = entry_auth
+        self._clock = clock
+        self._store = write_queue_store(hass, entry_id)
+        self._items: list[TraktQueuedWrite] = []
+        self._lock = asyncio.Lock()
+        self._flush_job = HassJob(self._async_scheduled_flush, cancel_on_shutdown=True)
+        self._unsub_flush: CALLBACK_TYPE | None = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    async def async_load(self) -> None:
+        """Restore pending writes."""
+        self._items = await self._store.async_load() or []
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Flush periodically and whenever items are waiting, until stopped."""
+        unsub_interval = async_track_time_interval(
+            self._hass, self._async_interval_flush, WRITE_FLUSH_INTERVAL
+        )
+        if self._items:
+            self._async_schedule_flush()
+
+        @callback
+        def _async_stop() -> None:
+            unsub_interval()
+            if self._unsub_flush is not None:
+                self._unsub_flush()
+                self._unsub_flush = None
+
+        return _async_stop
+
+    @callback
+    def async_enqueue(self, item: TraktQueuedWrite) -> None:
+        """Add a write and flush soon, batching any that follow it."""
+        self._items.append(item)
+        self._store.async_delay_save(self._data_to_save, WRITE_QUEUE_SAVE_DELAY)
+        self._async_schedule_flush()
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, WRITE_FLUSH_DELAY, self._flush_job
+            )
+
+    async def _async_scheduled_flush(self, now: dt.datetime) -> None:
+        self._unsub_flush = None
+        await self.async_flush()
+
+    async def _async_interval_flush(self, now: dt.datetime) -> None:
+        if self._items:
+            await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Send pending writes until the queue is empty or Trakt is unavailable."""
+        async with self._lock:
+            now = self._clock()
+            self._items = [
+                expired
+                for item in self._items
+                if (expired := _expire(item, now)) is not None
+            ]
+
+            try:
+                while live := [i for i in self._items if i["kind"] != "history"]:
+                    await self._async_send(live[:1])
+                while history := [i for i in self._items if i["kind"] == "history"]:
+                    await self._async_send(history[:WRITE_BATCH_SIZE])
+            except (TraktRateLimitedError, RequestError) as err:
+                LOGGER.debug("Keeping %d queued Trakt writes: %s", len(self), err)
+            finally:
+                self._store.async_delay_save(self._data_to_save, WRITE_QUEUE_SAVE_DELAY)
+
+    async def _async_send(self, items: list[TraktQueuedWrite]) -> None:
+        """Send items and remove them, unless the failure can be retried.
+
+        A batch Trakt rejects as invalid is split in halves until the items
+        at fault are isolated, so only those are dropped.
+        """
+        try:
+            if items[0]["kind"] == "history":
+                await self._async_send_history(items)
+            else:
+                await self._async_send_live(items[0])
+        except RequestError as err:
+            if err.status is None or err.status in WRITE_RETRY_STATUSES:
+                raise
+            if len(items) > 1:
+                half = len(items) // 2
+                await self._async_send(items[:half])
+                await self._async_send(items[half:])
+                return
+            LOGGER.warning("Trakt rejected queued write %s: %s", items[0], err)
+        sent = {id(item) for item in items}
+        self._items = [item for item in self._items if id(item) not in sent]
+
+    async def _async_send_live(self, item: TraktQueuedWrite) -> None:
+        body: dict[str, Any] = {item["media_type"]: {"ids": item["ids"]}}
+        if item["kind"] == "checkin":
+            if "message" in item:
+                body["message"] = item["message"]
+            path = "/checkin"
+        else:
+            body["progress"] = item.get("progress", 0)
+            path = f"/scrobble/{item.get('action', 'start')}"
+        response = await self._entry_auth.async_request(
+            "POST", path, priority=RequestPriority.LOW, json=body
+        )
+        response.release()
+
+    async def _async_send_history(self, items: list[TraktQueuedWrite]) -> None:
+        body: dict[str, list[dict[str, Any]]] = {"movies": [], "episodes": []}
+        for item in items:
+            body[f"{item['media_type']}s"].append(
+                {"ids": item["ids"], "watched_at": item["watched_at"]}
+            )
+        response = await self._entry_auth.async_request(
+            "POST", "/sync/history", priority=RequestPriority.LOW, json=body
+        )
+        result = await response.json()
+        not_found = {
+            type: entries
+            for type, entries in result.get("not_found", {}).items()
+            if entries
+        }
+        if not_found:
+            LOGGER.warning("Dropping watched items Trakt could not find: %s", not_found)
+
+    @callback
+    def _data_to_save(self) -> list[TraktQueuedWrite]:
+        return list(self._items)